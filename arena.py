@@ -0,0 +1,135 @@
+"""Duplicate-deal bot arena for low-variance strategy comparison.
+
+Each deal is replayed once per seat rotation, with the same seeded deck
+every time, so each strategy plays every seat's cards in every position and
+most of the card luck cancels out. Results are chip EV per hand in big
+blinds with 95% confidence intervals over deals.
+
+A strategy is any Player subclass that implements choose_action (see
+AIPlayer): the arena creates fresh instances for every hand.
+"""
+
+import argparse
+import math
+import os
+import random
+from multiprocessing import Pool
+
+from dealer import Dealer
+from frontend import BotFrontend
+from player import AIPlayer, Player
+from shared_cache import SharedEquityCache, init_worker
+from table import Table
+
+CACHE_CAPACITY = 1 << 20  # shared equity cache slots for pooled runs
+START_STACK = 1000
+SMALL_BLIND = 10
+BIG_BLIND = 20
+
+
+class CallingStation(Player):
+    """Baseline strategy: never folds, never raises."""
+
+    def choose_action(self, to_call, min_raise, max_raise, pot, current_bet=0, equity=None, num_community=5, players_in_hand=2, big_blind=10, icm_equity=None, potential=None, opponent_stats=None):
+        if to_call == 0:
+            return ("check", 0)
+        if to_call >= self.chips:
+            return ("all-in", self.chips)
+        return ("call", to_call)
+
+
+def play_duplicate_deal(strategies, seats, deal_seed, start_stack=START_STACK,
+                        small_blind=SMALL_BLIND, big_blind=BIG_BLIND):
+    """Play one deal under every distinct seat rotation; return chip result per strategy in BB.
+
+    Strategies alternate around the table, so only len(strategies) rotations
+    are distinct; across them every strategy plays every seat exactly once.
+    """
+    names = list(strategies)
+    results = {name: 0.0 for name in names}
+    for rotation in range(len(names)):
+        assignment = [names[(seat + rotation) % len(names)] for seat in range(seats)]
+        players = [strategies[name](f"Seat {seat + 1}", start_stack)
+                   for seat, name in enumerate(assignment)]
+        table = Table(small_blind, big_blind, escalate_every=None)
+        table.dealer_pos = seats - 1  # button moves to seat 1 for the hand
+        dealer = Dealer(table, players, BotFrontend())
+        # Results are scored in chips, so no prize-pool (ICM) pressure on decisions
+        dealer.payouts = None
+        # Decisions and equity sampling are reproducible per rotation as well
+        random.seed(deal_seed * len(names) + rotation)
+        dealer.play_hand(seed=deal_seed)
+        for name, p in zip(assignment, players):
+            results[name] += (p.chips - start_stack) / big_blind
+    # Each strategy holds seats / len(names) seats in each of len(names) rotations
+    return {name: total / seats for name, total in results.items()}
+
+
+def _play_job(args):
+    return play_duplicate_deal(*args)
+
+
+def run_arena(strategies, deals=200, seats=6, seed=None, workers=1, cache=None):
+    """Run duplicate deals; return {name: (mean_bb_per_hand, ci95, per_deal_results)}.
+
+    With several workers, every rotation of a deal re-asks the same equity
+    spots from different processes, so workers share a SharedEquityCache
+    (a temporary one unless `cache` is given).
+    """
+    if seats % len(strategies):
+        raise ValueError(f"seats ({seats}) must be a multiple of the number of strategies ({len(strategies)})")
+    rng = random.Random(seed)
+    jobs = [(strategies, seats, rng.getrandbits(32)) for _ in range(deals)]
+    if workers > 1:
+        own_cache = cache is None
+        if own_cache:
+            cache = SharedEquityCache.create(CACHE_CAPACITY)
+        try:
+            with Pool(workers, initializer=init_worker, initargs=(cache,)) as pool:
+                per_deal = pool.map(_play_job, jobs)
+        finally:
+            if own_cache:
+                cache.close(unlink=True)
+    else:
+        per_deal = [_play_job(job) for job in jobs]
+
+    summary = {}
+    for name in strategies:
+        values = [r[name] for r in per_deal]
+        n = len(values)
+        mean = sum(values) / n
+        var = sum((v - mean) ** 2 for v in values) / (n - 1) if n > 1 else 0.0
+        summary[name] = (mean, 1.96 * math.sqrt(var / n), values)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Duplicate-deal comparison of AI strategies")
+    parser.add_argument("--deals", type=int, default=200)
+    parser.add_argument("--seats", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    strategies = {"AIPlayer": AIPlayer, "CallingStation": CallingStation}
+    print(f"\n  Duplicate arena: {args.deals} deals x {len(strategies)} rotations, "
+          f"{args.seats} seats, {', '.join(strategies)}\n")
+    cache = SharedEquityCache.create(CACHE_CAPACITY) if args.workers > 1 else None
+    try:
+        summary = run_arena(strategies, args.deals, args.seats, args.seed, args.workers, cache)
+        for name, (mean, ci, _) in sorted(summary.items(), key=lambda kv: -kv[1][0]):
+            print(f"  {name:16s} {mean:+8.3f} BB/hand  (95% CI +/- {ci:.3f})")
+        if cache is not None:
+            workers = cache.worker_stats()
+            hits = sum(w["hits"] for w in workers)
+            lookups = hits + sum(w["misses"] for w in workers)
+            print(f"\n  Shared equity cache: {hits}/{lookups} hits "
+                  f"({hits / lookups if lookups else 0.0:.1%}), {cache.entries()} entries")
+        print()
+    finally:
+        if cache is not None:
+            cache.close(unlink=True)
+
+
+if __name__ == "__main__":
+    main()
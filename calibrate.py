@@ -0,0 +1,280 @@
+"""Equity accuracy-versus-latency calibration harness.
+
+Draws a seeded corpus of spots per street and opponent count, computes
+ground truth, then runs calculate_equity under a grid of sample-size
+settings (equity.BOARD_SAMPLES / MULTIWAY_BOARD_SAMPLES and
+OPPONENT_COMBO_SAMPLES) and reports each setting's error distribution
+against its wall-clock cost. The Pareto-optimal settings are marked, and the
+cheapest setting meeting the error target is recommended per street.
+
+Preflop (--streets 0) has no sampler settings: calculate_equity reads
+preflop_equity.json. That mode measures the shipped table, and what
+precompute_equity.simulate_equity gives at a grid of simulation counts,
+so its NUM_SIMULATIONS can be checked against the same target (cost there
+is per table entry, paid once at build time).
+
+Ground truth is exhaustive enumeration heads-up (every runout x every
+opponent combo). Multiway lineups cannot be enumerated in reasonable time,
+so those use a large Monte Carlo reference, and its standard error is
+reported next to the results. Preflop references use more lineups, since
+the errors being measured there are smaller.
+"""
+
+import argparse
+import csv
+import os
+import random
+import time
+from contextlib import contextmanager
+from itertools import combinations
+from multiprocessing import Pool
+
+from treys import Deck, Evaluator
+
+import equity
+import precompute_equity
+
+evaluator = Evaluator()
+
+STREETS = {0: "preflop", 3: "flop", 4: "turn", 5: "river"}
+OPPONENTS = (1, 2, 4, 8)
+BOARD_GRID = (50, 100, 150, 300, 600)
+COMBO_GRID = (50, 100, 200, 300, 600)
+REFERENCE_LINEUPS = 20000
+PREFLOP_REFERENCE_LINEUPS = 100000
+PREFLOP_SIMS_GRID = (500, 1000, 2000, 5000, 10000)
+
+
+def draw_corpus(spots, streets=(3, 4, 5), opponents=OPPONENTS, seed=0):
+    """[(street, opponents, hole, board)] with `spots` random deals per bucket."""
+    rng = random.Random(seed)
+    deck = Deck.GetFullDeck()
+    corpus = []
+    for street in streets:
+        for n in opponents:
+            for _ in range(spots):
+                cards = rng.sample(deck, 2 + street)
+                corpus.append((street, n, cards[:2], cards[2:]))
+    return corpus
+
+
+def exact_heads_up(hole, board):
+    """Exhaustive heads-up equity over every runout and opponent combo."""
+    remaining = [c for c in Deck.GetFullDeck() if c not in hole and c not in board]
+    share = 0.0
+    total = 0
+    for runout in combinations(remaining, 5 - len(board)):
+        full = board + list(runout)
+        hero = evaluator.evaluate(full, hole)
+        deck = [c for c in remaining if c not in runout]
+        for opp in combinations(deck, 2):
+            score = evaluator.evaluate(full, list(opp))
+            total += 1
+            if hero < score:
+                share += 1
+            elif hero == score:
+                share += 0.5
+    return share / total, 0.0
+
+
+def reference_multiway(hole, board, num_opponents, lineups=REFERENCE_LINEUPS, seed=0):
+    """Monte Carlo reference over full lineups: (equity, standard error)."""
+    rng = random.Random(seed)
+    remaining = [c for c in Deck.GetFullDeck() if c not in hole and c not in board]
+    needed = 5 - len(board)
+    share = 0.0
+    sq = 0.0
+    for _ in range(lineups):
+        drawn = rng.sample(remaining, needed + 2 * num_opponents)
+        full = board + drawn[:needed]
+        hero = evaluator.evaluate(full, hole)
+        scores = [evaluator.evaluate(full, drawn[needed + 2 * i: needed + 2 * i + 2])
+                  for i in range(num_opponents)]
+        best = min(scores)
+        # A tied pot splits evenly among everyone holding the best hand
+        x = 1.0 if hero < best else 1.0 / (scores.count(best) + 1) if hero == best else 0.0
+        share += x
+        sq += x * x
+    mean = share / lineups
+    var = max(0.0, sq / lineups - mean * mean)
+    return mean, (var / lineups) ** 0.5
+
+
+def ground_truth(spot):
+    street, n, hole, board = spot
+    if street == 0:
+        return reference_multiway(hole, board, n, PREFLOP_REFERENCE_LINEUPS)
+    if n == 1:
+        return exact_heads_up(hole, board)
+    return reference_multiway(hole, board, n)
+
+
+@contextmanager
+def settings(boards=None, combos=None, atlas=False):
+    """Temporarily apply sample sizes; disables the flop atlas, shared cache and store."""
+    saved = (equity.BOARD_SAMPLES, equity.MULTIWAY_BOARD_SAMPLES,
+             equity.OPPONENT_COMBO_SAMPLES, equity._FLOP_ATLAS, equity._SHARED_CACHE,
+             equity._EQUITY_STORE)
+    if boards is not None:
+        equity.BOARD_SAMPLES = equity.MULTIWAY_BOARD_SAMPLES = boards
+    if combos is not None:
+        equity.OPPONENT_COMBO_SAMPLES = combos
+    if not atlas:
+        equity._FLOP_ATLAS = None
+    equity._SHARED_CACHE = None
+    equity._EQUITY_STORE = None  # stored spots would hide the sampler being measured
+    try:
+        yield
+    finally:
+        (equity.BOARD_SAMPLES, equity.MULTIWAY_BOARD_SAMPLES,
+         equity.OPPONENT_COMBO_SAMPLES, equity._FLOP_ATLAS, equity._SHARED_CACHE,
+         equity._EQUITY_STORE) = saved
+
+
+def measure(spots, truths):
+    """Run calculate_equity on each spot: (abs errors, seconds per call)."""
+    errors = []
+    start = time.perf_counter()
+    for (street, n, hole, board), (truth, _) in zip(spots, truths):
+        remaining = [c for c in Deck.GetFullDeck() if c not in hole and c not in board]
+        errors.append(abs(equity.calculate_equity(hole, board, n, remaining) - truth))
+    return errors, (time.perf_counter() - start) / max(len(spots), 1)
+
+
+def measure_preflop(spots, truths, sims=None):
+    """Preflop errors of the shipped table (sims=None) or of simulate_equity at sims.
+
+    A category's equity is the same for every combo in it, so simulating the
+    spot's own hole cards measures what a table built at sims would hold.
+    """
+    if sims is None:
+        with settings():
+            return measure(spots, truths)
+    errors = []
+    start = time.perf_counter()
+    for (street, n, hole, board), (truth, _) in zip(spots, truths):
+        errors.append(abs(precompute_equity.simulate_equity(hole, n, sims) - truth))
+    return errors, (time.perf_counter() - start) / max(len(spots), 1)
+
+
+def _summarize(errors):
+    errors = sorted(errors)
+    p90 = errors[min(len(errors) - 1, int(0.9 * len(errors)))]
+    return sum(errors) / len(errors), p90
+
+
+def modes_for(street):
+    """Settings that matter on this street: (label, boards, combos, atlas)."""
+    if street == 5:
+        return [("river-index", None, None, False)]
+    modes = []
+    boards_grid = BOARD_GRID if street == 3 else (None,)  # turn runouts are always enumerated
+    for boards in boards_grid:
+        for combos in COMBO_GRID:
+            label = f"boards={boards} combos={combos}" if boards else f"combos={combos}"
+            modes.append((label, boards, combos, False))
+    if street == 3 and equity._FLOP_ATLAS is not None:
+        modes.append(("flop-atlas", None, None, True))
+    return modes
+
+
+def preflop_modes():
+    """Preflop settings: (label, sims), the shipped table first (sims None)."""
+    current = precompute_equity.NUM_SIMULATIONS
+    return [("preflop-table", None)] + [
+        (f"sims={sims}" + (" (current)" if sims == current else ""), sims)
+        for sims in PREFLOP_SIMS_GRID]
+
+
+def pareto(rows):
+    """Mark rows not beaten on both cost and p90 error by a cheaper row."""
+    best = float("inf")
+    for row in sorted(rows, key=lambda r: r["ms"]):
+        row["pareto"] = row["p90_err"] < best
+        best = min(best, row["p90_err"])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate equity sample sizes")
+    parser.add_argument("--spots", type=int, default=10, help="spots per street x opponent bucket")
+    parser.add_argument("--streets", default="3,4,5",
+                        help="board sizes to calibrate (0 = the preflop table)")
+    parser.add_argument("--opponents", default="1,2,4,8")
+    parser.add_argument("--target", type=float, default=0.02, help="p90 absolute error target")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", default=None, help="write every measurement to this CSV file")
+    args = parser.parse_args()
+
+    streets = tuple(int(s) for s in args.streets.split(","))
+    opponents = tuple(int(n) for n in args.opponents.split(","))
+    corpus = draw_corpus(args.spots, streets, opponents, args.seed)
+    print(f"Computing ground truth for {len(corpus)} spots ({args.workers} workers)...")
+    start = time.time()
+    with Pool(args.workers) as pool:
+        truths = pool.map(ground_truth, corpus)
+    print(f"  done in {time.time() - start:.0f}s\n")
+
+    random.seed(args.seed)
+    rows = []
+    for street in streets:
+        for n in opponents:
+            idx = [i for i, s in enumerate(corpus) if s[0] == street and s[1] == n]
+            spots = [corpus[i] for i in idx]
+            bucket_truths = [truths[i] for i in idx]
+            ref_se = max(se for _, se in bucket_truths)
+            bucket = []
+            if street == 0:
+                modes = [(label, None, None, False, sims) for label, sims in preflop_modes()]
+            else:
+                modes = [mode + (None,) for mode in modes_for(street)]
+            for label, boards, combos, atlas, sims in modes:
+                if street == 0:
+                    errors, secs = measure_preflop(spots, bucket_truths, sims)
+                else:
+                    with settings(boards, combos, atlas):
+                        errors, secs = measure(spots, bucket_truths)
+                mean_err, p90_err = _summarize(errors)
+                bucket.append({"street": STREETS[street], "opponents": n, "mode": label,
+                               "boards": boards, "combos": combos, "sims": sims,
+                               "mean_err": mean_err, "p90_err": p90_err, "ms": secs * 1000,
+                               "ref_se": ref_se})
+            pareto(bucket)
+            rows.extend(bucket)
+
+            print(f"  {STREETS[street]}, {n} opponent(s)  (reference s.e. <= {ref_se:.4f})")
+            for r in sorted(bucket, key=lambda r: r["ms"]):
+                mark = "*" if r["pareto"] else " "
+                print(f"   {mark} {r['mode']:26s} {r['ms']:9.1f} ms  "
+                      f"mean err {r['mean_err']:.4f}  p90 err {r['p90_err']:.4f}")
+            print()
+
+    print(f"  Recommended settings (cheapest with p90 error <= {args.target} for every opponent count):")
+    for street in streets:
+        name = STREETS[street]
+        # The shipped table is a free lookup; preflop recommends what to build it with
+        labels = {r["mode"] for r in rows if r["street"] == name and r["mode"] != "preflop-table"}
+        ok = []
+        for label in labels:
+            mode_rows = [r for r in rows if r["street"] == name and r["mode"] == label]
+            if all(r["p90_err"] <= args.target for r in mode_rows):
+                ok.append((max(r["ms"] for r in mode_rows), label))
+        if ok:
+            ms, label = min(ok)
+            unit = "ms/table entry" if street == 0 else "ms/call"
+            print(f"    {name:5s}  {label}  (worst {ms:.1f} {unit})")
+        else:
+            print(f"    {name:5s}  no setting meets the target")
+    print()
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Wrote {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
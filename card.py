@@ -1,3 +1,4 @@
+import random
 from treys import Card, Deck as TreysDeck
 
 
@@ -39,14 +40,23 @@ def pretty_cards(card_ints):
 
 class Deck:
     def __init__(self):
-        self._deck = TreysDeck()
-
-    def shuffle(self):
-        self._deck = TreysDeck()
+        self._cards = TreysDeck.GetFullDeck()
+
+    def shuffle(self, seed=None):
+        # Start from the ordered deck: treys decks pre-shuffle from their own
+        # entropy, which would make seeded deals irreproducible
+        self._cards = TreysDeck.GetFullDeck()
+        if seed is not None:
+            # Reproducible deal order without touching the global random state
+            random.Random(seed).shuffle(self._cards)
+        else:
+            # Global state, so random.seed() reproduces a whole game
+            random.shuffle(self._cards)
 
     def deal(self, n=1):
-        return self._deck.draw(n)
+        # Same order as treys Deck.draw: cards come off the end
+        return [self._cards.pop() for _ in range(n)]
 
     @property
     def cards(self):
-        return list(self._deck.cards)
+        return list(self._cards)
@@ -1,21 +1,36 @@
 from card import Deck
-from equity import calculate_equity
+from equity import (calculate_equity, calculate_potential, equity_matrix, estimates_shared,
+                    pot_shares, runout_ladder, score_runouts)
 import display
-from display import (
-    render_game_state, render_action, render_showdown,
-    render_winner_no_showdown, render_elimination, wait_for_enter,
-)
+from frontend import TerminalFrontend, drive
 from treys import Evaluator
 from player import HumanPlayer, recommend_action
+from icm import DEFAULT_PAYOUTS, icm_required_equity
+from rollout import HandState
 
 _evaluator = Evaluator()
 
 
 class Dealer:
-    def __init__(self, table, players):
+    def __init__(self, table, players, frontend=None):
         self.table = table
         self.players = players
         self.deck = Deck()
+        self.frontend = frontend if frontend is not None else TerminalFrontend()
+        self.payouts = DEFAULT_PAYOUTS  # prize-pool fractions for ICM; None turns ICM off
+        # Keep sampling the human's flop/turn equity on each action and average
+        # the estimates instead of reusing the first one
+        self.refine_human_equity = False
+        self._human_equity_key = None
+        self._human_equity = None
+        self._human_equity_samples = 0
+        self._human_potential = None
+        # Also compute hand potential (EHS, PPot, NPot) for AI players; it
+        # replaces their equity pass
+        self.ai_potentials = False
+        # rollout.RolloutAdvisor: when set, the human's recommendation comes
+        # from rollout EVs instead of the equity threshold rule
+        self.advisor = None
 
     def _active_players(self):
         return [p for p in self.players if p.is_active]
@@ -110,20 +125,59 @@ class Dealer:
                 return p
         return None
 
+    def _opponent_stats(self, player):
+        """Decayed stats view of each opponent still in the hand (None until seen)."""
+        return {q.name: self.table.stats.view(q.name, "decayed")
+                for q in self._players_in_hand() if q is not player}
+
     def _compute_human_equity(self):
-        """Cheap single-player equity for the human (used for display)."""
+        """Cheap single-player equity for the human (used for display).
+
+        Memoized per (hole cards, board, opponents in hand), so it is only
+        recomputed on a new street or after a fold.
+        """
         human = self._get_human()
         if human is None or not human.is_in_hand or not human.hole_cards:
             return None
         opponents = len([p for p in self._players_in_hand() if p is not human])
         if opponents == 0:
             return 1.0
-        return calculate_equity(
-            human.hole_cards,
-            self.table.community_cards,
-            opponents,
-            self.deck.cards,
-        )
+        key = (tuple(human.hole_cards), tuple(self.table.community_cards), opponents)
+        if key == self._human_equity_key:
+            if not (self.refine_human_equity and len(self.table.community_cards) in (3, 4)):
+                return self._human_equity
+        else:
+            self._human_equity_key = key
+            self._human_equity = None
+            self._human_equity_samples = 0
+        # Postflop, potential comes out of the same pass as equity; both go
+        # through the shared cache and equity store
+        self._human_potential = None
+        if self.frontend.wants_potential:
+            self._human_potential = calculate_potential(
+                human.hole_cards,
+                self.table.community_cards,
+                opponents,
+                self.deck.cards,
+            )
+        if self._human_potential is not None:
+            estimate = self._human_potential["equity"]
+        else:
+            estimate = calculate_equity(
+                human.hole_cards,
+                self.table.community_cards,
+                opponents,
+                self.deck.cards,
+            )
+        n = self._human_equity_samples
+        if n == 0 or estimates_shared():
+            # The store already merged this pass with earlier ones (and a
+            # cache hit is the same value again), so take it as is
+            self._human_equity = estimate
+        else:
+            self._human_equity = (self._human_equity * n + estimate) / (n + 1)
+        self._human_equity_samples = n + 1
+        return self._human_equity
 
     def _ensure_equities(self):
         """Compute per-player equities lazily, caching by board state.
@@ -141,19 +195,83 @@ class Dealer:
             remaining = self.deck.cards
             opponents = len(in_hand) - 1
             for p in in_hand:
-                if p.hole_cards:
+                if not p.hole_cards:
+                    continue
+                potential = None
+                if self.ai_potentials and not isinstance(p, HumanPlayer):
+                    potential = calculate_potential(p.hole_cards, self.table.community_cards,
+                                                    opponents, remaining)
+                if potential is not None:
+                    self.table.potentials[p.name] = potential
+                    self.table.equities[p.name] = potential["equity"]
+                else:
                     self.table.equities[p.name] = calculate_equity(
                         p.hole_cards, self.table.community_cards,
                         opponents, remaining,
                     )
         self._equities_board_key = board_key
 
-    def _render(self, equity=None, recommendation=None, to_call=0, min_bet=0):
-        human = self._get_human()
-        if human:
-            render_game_state(human, self.table, self.players, equity, recommendation, to_call, min_bet)
+    def _update_known_equities(self):
+        """Cheat-mode view from everyone's known cards, off one set of scored runouts.
+
+        Fills table.known_equities (share of the whole pot), table.pairwise
+        (heads-up equity between each pair) and table.pot_evs (expected chips
+        back from the side pots as currently built). Runout scores are cached
+        per board and lineup, so refreshing after each action is cheap.
+        """
+        in_hand = [p for p in self._players_in_hand() if p.hole_cards]
+        if len(in_hand) < 2:
+            self.table.known_equities = {p.name: 1.0 for p in in_hand}
+            self.table.pairwise = {}
+            self.table.pot_evs = {p.name: self.table.pot for p in in_hand}
+            return
+        hands = [p.hole_cards for p in in_hand]
+        board = self.table.community_cards
+        multiway, matrix = equity_matrix(hands, board, self.deck.cards)
+        names = [p.name for p in in_hand]
+        self.table.known_equities = dict(zip(names, multiway))
+        self.table.pairwise = {a: {b: matrix[i][j] for j, b in enumerate(names) if i != j}
+                               for i, a in enumerate(names)}
+
+        scores = score_runouts(hands, board, self.deck.cards)
+        index = {name: i for i, name in enumerate(names)}
+        evs = dict.fromkeys(names, 0.0)
+        for amount, eligible in self._build_side_pots():
+            seats = [index[name] for name in eligible if name in index]
+            if not seats:
+                continue
+            for i, share in enumerate(pot_shares(scores, seats)):
+                evs[names[i]] += amount * share
+        self.table.pot_evs = evs
+
+    def _icm_required_equity(self, player, to_call):
+        """Equity needed to call under ICM, against the biggest bet in front of player."""
+        if to_call <= 0 or not self.payouts:
+            return None
+        active = self._active_players()
+        villain = max((p for p in self._players_in_hand() if p is not player),
+                      key=lambda p: p.current_bet, default=None)
+        if villain is None:
+            return None
+        stacks = [p.chips for p in active]
+        return icm_required_equity(stacks, active.index(player), active.index(villain),
+                                   self.table.pot, to_call, self.payouts)
+
+    async def _emit(self, name, **data):
+        await self.frontend.event(self, name, **data)
+
+    async def _render(self, equity=None, recommendation=None, to_call=0, min_bet=0, actor=None, icm_required=None):
+        if display.CHEAT_MODE:
+            self._update_known_equities()
+        potential = self._human_potential if equity is not None else None
+        await self._emit("state", equity=equity, recommendation=recommendation,
+                         to_call=to_call, min_bet=min_bet, actor=actor, icm_required=icm_required,
+                         potential=potential)
 
     def betting_round(self, is_preflop=False):
+        return drive(self.frontend, self.betting_round_async(is_preflop))
+
+    async def betting_round_async(self, is_preflop=False):
         if is_preflop:
             # Preflop: start from player after BB (UTG)
             order = self._get_position_order(start_offset=1)
@@ -193,32 +311,48 @@ class Dealer:
                 break
 
             to_call = current_bet - p.current_bet
+            bet_before = current_bet
             max_raise = p.chips
             min_raise_to = current_bet + min_raise_size
 
             equity = self._compute_human_equity()
+            icm_need = self._icm_required_equity(p, to_call)
             rec = None
             if isinstance(p, HumanPlayer) and equity is not None:
-                rec = recommend_action(equity, to_call, self.table.pot, p.chips, min_raise_to, max_raise, num_community=len(self.table.community_cards), current_bet=current_bet, players_in_hand=len(self._players_in_hand()))
-            self._render(equity, rec, to_call if isinstance(p, HumanPlayer) else 0, min_raise_to if isinstance(p, HumanPlayer) else 0)
+                evs = None
+                if self.advisor is not None:
+                    evs = self.advisor.evaluate(HandState.from_dealer(self, p, current_bet, min_raise_size, acted))
+                rec = recommend_action(equity, to_call, self.table.pot, p.chips, min_raise_to, max_raise, num_community=len(self.table.community_cards), current_bet=current_bet, players_in_hand=len(self._players_in_hand()), action_evs=evs)
+            await self._render(equity, rec, to_call if isinstance(p, HumanPlayer) else 0, min_raise_to if isinstance(p, HumanPlayer) else 0, actor=p,
+                               icm_required=icm_need if isinstance(p, HumanPlayer) else None)
 
             if not isinstance(p, HumanPlayer):
                 self._ensure_equities()
+            if getattr(p, "uses_hand_state", False):
+                p.hand_state = HandState.from_dealer(self, p, current_bet, min_raise_size, acted)
 
             equity_val = self.table.equities.get(p.name, 0.5) if not isinstance(p, HumanPlayer) else equity
-            action, amount = p.choose_action(to_call, min_raise_to, max_raise, self.table.pot, current_bet, equity=equity_val, num_community=len(self.table.community_cards), players_in_hand=len(self._players_in_hand()), big_blind=self.table.big_blind)
+            action, amount = await self.frontend.decide(
+                self, p, to_call=to_call, min_raise=min_raise_to, max_raise=max_raise,
+                pot=self.table.pot, current_bet=current_bet, equity=equity_val,
+                num_community=len(self.table.community_cards),
+                players_in_hand=len(self._players_in_hand()), big_blind=self.table.big_blind,
+                icm_equity=icm_need,
+                potential=self._human_potential if isinstance(p, HumanPlayer) else self.table.potentials.get(p.name),
+                opponent_stats=self._opponent_stats(p),
+            )
 
             if action == "fold":
                 p.fold()
-                render_action(p.name, "fold")
+                await self._emit("action", player=p, action="fold", amount=0)
             elif action == "check":
                 p.last_action = "check"
-                render_action(p.name, "check")
+                await self._emit("action", player=p, action="check", amount=0)
             elif action == "call":
                 actual = p.bet(to_call)
                 self._add_to_pot(p, actual)
                 p.last_action = f"call ${actual}"
-                render_action(p.name, "call", actual)
+                await self._emit("action", player=p, action="call", amount=actual)
             elif action == "raise":
                 # amount is the total raise-to amount
                 raise_to = amount
@@ -239,7 +373,7 @@ class Dealer:
                     acted = {p}
                     i = 0  # will be incremented to 1
                 p.last_action = f"raise ${p.current_bet}"
-                render_action(p.name, "raise", p.current_bet)
+                await self._emit("action", player=p, action="raise", amount=p.current_bet)
             elif action == "all-in":
                 actual = p.bet(p.chips)
                 self._add_to_pot(p, actual)
@@ -255,15 +389,12 @@ class Dealer:
                     acted = {p}
                     i = 0
                 p.last_action = f"all-in ${p.current_bet}"
-                render_action(p.name, "all-in", actual)
+                await self._emit("action", player=p, action="all-in", amount=actual)
 
+            self.table.stats.record_action(p.name, action, is_preflop, aggressive=current_bet > bet_before)
             acted.add(p)
             i += 1
 
-            if not isinstance(p, HumanPlayer):
-                import time
-                time.sleep(0.3)
-
         # Reset per-round bets
         for p in self._players_in_hand():
             p.reset_for_round()
@@ -292,13 +423,17 @@ class Dealer:
         return pots
 
     def showdown(self):
+        return drive(self.frontend, self.showdown_async())
+
+    async def showdown_async(self):
         in_hand = self._players_in_hand()
         board = self.table.community_cards
 
         if len(in_hand) == 1:
             winner = in_hand[0]
             winner.chips += self.table.pot
-            render_winner_no_showdown(winner, self.table.pot)
+            self.table.stats.end_hand()
+            await self._emit("no_showdown", winner=winner, pot=self.table.pot)
             return
 
         # Evaluate hands
@@ -327,14 +462,20 @@ class Dealer:
                 results[pot_winners[0]][0].chips += remainder
             awards.append((pot_winners, pot_amount))
 
-        render_showdown(awards, hands_info, board, self.table.pot)
+        self.table.stats.showdown(results, {name for names, _ in awards for name in names})
+        self.table.stats.end_hand()
+        await self._emit("showdown", awards=awards, hands=hands_info, board=board, pot=self.table.pot)
 
-    def play_hand(self):
+    def play_hand(self, seed=None):
+        return drive(self.frontend, self.play_hand_async(seed))
+
+    async def play_hand_async(self, seed=None):
         # Setup
         self.table.reset_for_hand()
         self._equities_board_key = None
+        self._human_potential = None
         self._rotate_dealer()
-        self.deck.shuffle()
+        self.deck.shuffle(seed)
 
         for p in self.players:
             p.reset_for_hand()
@@ -348,57 +489,63 @@ class Dealer:
 
         # Deal hole cards
         self._deal_hole_cards()
+        self.table.stats.start_hand(p.name for p in self._players_in_hand())
 
         # Preflop
         equity = self._compute_human_equity()
-        self._render(equity)
-        wait_for_enter("Press Enter for preflop betting...")
+        await self._render(equity)
+        await self.frontend.wait(self, "Press Enter for preflop betting...")
 
-        self.betting_round(is_preflop=True)
-        if len(self._players_in_hand()) <= 1:
-            self.showdown()
+        await self.betting_round_async(is_preflop=True)
+        if await self._finish_if_decided():
             return True
 
-        # Flop
-        self._deal_community(3)
-        if display.CHEAT_MODE:
-            self._ensure_equities()
-        equity = self._compute_human_equity()
-        self._render(equity)
-        wait_for_enter("Press Enter for flop betting...")
-
-        self.betting_round()
-        if len(self._players_in_hand()) <= 1:
-            self.showdown()
-            return True
-
-        # Turn
-        self._deal_community(1)
-        if display.CHEAT_MODE:
-            self._ensure_equities()
-        equity = self._compute_human_equity()
-        self._render(equity)
-        wait_for_enter("Press Enter for turn betting...")
+        for n, street in ((3, "flop"), (1, "turn"), (1, "river")):
+            self._deal_community(n)
+            if street == "flop":
+                self.table.stats.saw_flop(p.name for p in self._players_in_hand())
+            if display.CHEAT_MODE:
+                self._ensure_equities()
+            equity = self._compute_human_equity()
+            await self._render(equity)
+            await self.frontend.wait(self, f"Press Enter for {street} betting...")
 
-        self.betting_round()
-        if len(self._players_in_hand()) <= 1:
-            self.showdown()
-            return True
+            await self.betting_round_async()
+            if await self._finish_if_decided():
+                return True
+        return True
 
-        # River
-        self._deal_community(1)
-        if display.CHEAT_MODE:
-            self._ensure_equities()
-        equity = self._compute_human_equity()
-        self._render(equity)
-        wait_for_enter("Press Enter for river betting...")
+    async def _finish_if_decided(self):
+        """Go to showdown when no more betting can happen this hand.
 
-        self.betting_round()
-        self.showdown()
+        If at most one player can still act, the rest of the board is dealt
+        at once (fast-forward) instead of street by street.
+        """
+        in_hand = self._players_in_hand()
+        if len(in_hand) > 1 and len(self.table.community_cards) < 5:
+            if len(self._players_can_act()) > 1:
+                return False
+            await self._fast_forward(in_hand)
+        await self.showdown_async()
         return True
 
+    async def _fast_forward(self, in_hand):
+        board = list(self.table.community_cards)
+        self._deal_community(5 - len(board))
+        runout = self.table.community_cards[len(board):]
+        if len(board) < 3:
+            self.table.stats.saw_flop(p.name for p in in_hand)
+        # Headless front ends skip the ladder, so simulated all-ins cost one deal
+        ladder = None
+        if self.frontend.wants_runout_ladder:
+            ladder = runout_ladder([p.hole_cards for p in in_hand], board, runout, self.deck.cards)
+        await self._emit("runout", players=in_hand, ladder=ladder, board=self.table.community_cards)
+
     def eliminate_players(self):
+        return drive(self.frontend, self.eliminate_players_async())
+
+    async def eliminate_players_async(self):
         for p in self.players:
             if p.is_active and p.chips <= 0:
                 p.is_active = False
-                render_elimination(p)
+                await self._emit("elimination", player=p)
@@ -1,23 +1,78 @@
-import os
+import shutil
+import sys
+import time
 from card import pretty_cards, pretty_card
+from icm import icm_equities
 
 CHEAT_MODE = False
 
 
+class Screen:
+    """Keeps the last frame and rewrites only the lines that changed.
+
+    Each frame goes out as one buffered write using ANSI cursor positioning.
+    Output printed below the frame (action log, prompts) is cleared on the
+    next frame; if enough of it accumulates to scroll the terminal, the next
+    frame is a full redraw. Unforced frames arriving faster than
+    min_interval are skipped, and the newest one is drawn on the next frame.
+    """
+
+    def __init__(self, min_interval=1 / 30, stream=None):
+        self.min_interval = min_interval
+        self.stream = stream
+        self.lines = None
+        self.extra_lines = 0
+        self.last_draw = 0.0
+
+    def invalidate(self):
+        self.lines = None
+
+    def note_output(self, n=1):
+        self.extra_lines += n
+
+    def draw(self, lines, force=False):
+        now = time.monotonic()
+        if not force and self.lines is not None and now - self.last_draw < self.min_interval:
+            return False
+        rows = shutil.get_terminal_size().lines
+        # Leave room for untracked output such as the action prompt
+        if self.lines is None or len(self.lines) + self.extra_lines + 2 >= rows:
+            out = ["\033[H\033[2J", "\n".join(lines), "\n"]
+        else:
+            out = []
+            for i, line in enumerate(lines):
+                if i >= len(self.lines) or self.lines[i] != line:
+                    out.append(f"\033[{i + 1};1H{line}\033[K")
+            # Park the cursor below the frame and clear the old log beneath it
+            out.append(f"\033[{len(lines) + 1};1H\033[J")
+        stream = self.stream or sys.stdout
+        stream.write("".join(out))
+        stream.flush()
+        self.lines = list(lines)
+        self.extra_lines = 0
+        self.last_draw = now
+        return True
+
+
+_screen = Screen()
+
+
 def clear_screen():
-    os.system("cls" if os.name == "nt" else "clear")
+    sys.stdout.write("\033[H\033[2J")
+    sys.stdout.flush()
+    _screen.invalidate()
 
 
-def render_game_state(human, table, players, equity=None, recommendation=None, to_call=0, min_bet=0):
-    clear_screen()
-    print("=" * 60)
-    print(f"  TEXAS HOLD'EM  |  Hand #{table.hand_count}  |  Blinds: ${table.small_blind}/${table.big_blind}")
-    print("=" * 60)
+def render_game_state(human, table, players, equity=None, recommendation=None, to_call=0, min_bet=0, force=True, icm_required=None, potential=None):
+    out = []
+    out.append("=" * 60)
+    out.append(f"  TEXAS HOLD'EM  |  Hand #{table.hand_count}  |  Blinds: ${table.small_blind}/${table.big_blind}")
+    out.append("=" * 60)
 
-    print()
+    out.append("")
 
     # Other players
-    print("-" * 60)
+    out.append("-" * 60)
     for p in players:
         if p is human or not p.is_active:
             continue
@@ -29,48 +84,71 @@ def render_game_state(human, table, players, equity=None, recommendation=None, t
 
         pos = table.positions.get(p.name, " ")
         action_str = f"  ({p.last_action})" if p.last_action else ""
+        action_str += _stats_str(table, p.name)
         if CHEAT_MODE:
             if p.is_in_hand and p.hole_cards:
                 hand_str = pretty_cards(p.hole_cards)
-                eq = table.equities.get(p.name)
+                eq = table.known_equities.get(p.name, table.equities.get(p.name))
                 eq_str = f"  {eq:.0%}" if eq is not None else ""
-                print(f"  {hand_str}  {pos} {p.name:12s}  ${p.chips:>6}{status}{action_str}{eq_str}")
+                ev = table.pot_evs.get(p.name)
+                eq_str += f"  EV ${ev:.0f}" if ev is not None else ""
+                out.append(f"  {hand_str}  {pos} {p.name:12s}  ${p.chips:>6}{status}{action_str}{eq_str}")
             else:
                 # Pad to match card width ("A♠ K♠" = 5 visible chars + 2 spaces)
-                print(f"  {'':5s}  {pos} {p.name:12s}  ${p.chips:>6}{status}{action_str}")
+                out.append(f"  {'':5s}  {pos} {p.name:12s}  ${p.chips:>6}{status}{action_str}")
         else:
-            print(f"  {pos} {p.name:12s}  ${p.chips:>6}{status}{action_str}")
-    print("-" * 60)
+            out.append(f"  {pos} {p.name:12s}  ${p.chips:>6}{status}{action_str}")
+    out.append("-" * 60)
 
     # Board and pot
+    out.append("")
     if table.community_cards:
-        print(f"\n  Board: {pretty_cards(table.community_cards)}")
+        out.append(f"  Board: {pretty_cards(table.community_cards)}")
     else:
-        print("\n  Board: --")
-    print(f"  Pot: ${table.pot}")
+        out.append("  Board: --")
+    out.append(f"  Pot: ${table.pot}")
 
     # Human player
-    print()
+    out.append("")
     if human.hole_cards:
-        print(f"  Your hand: {pretty_cards(human.hole_cards)}")
+        out.append(f"  Your hand: {pretty_cards(human.hole_cards)}")
     if equity is not None:
         if to_call > 0:
             pot_odds = to_call / (table.pot + to_call)
-            print(f"  Equity: {equity:.1%}  |  Pot odds to call: {pot_odds:.1%}")
+            icm_str = f"  |  ICM needs: {icm_required:.1%}" if icm_required is not None else ""
+            out.append(f"  Equity: {equity:.1%}  |  Pot odds to call: {pot_odds:.1%}{icm_str}")
         elif min_bet > 0:
             pot_odds = min_bet / (table.pot + min_bet)
-            print(f"  Equity: {equity:.1%}  |  Pot odds to min bet: {pot_odds:.1%}")
+            out.append(f"  Equity: {equity:.1%}  |  Pot odds to min bet: {pot_odds:.1%}")
         else:
-            print(f"  Equity: {equity:.1%}")
+            out.append(f"  Equity: {equity:.1%}")
+    if CHEAT_MODE and table.pairwise.get(human.name):
+        vs = "  |  ".join(f"{name} {eq:.0%}" for name, eq in table.pairwise[human.name].items())
+        out.append(f"  Heads-up vs: {vs}")
+        ev = table.pot_evs.get(human.name)
+        if ev is not None:
+            out.append(f"  Pot EV: ${ev:.0f}")
+    if potential is not None and len(table.community_cards) < 5:
+        out.append(f"  EHS: {potential['ehs']:.1%}  |  EHS²: {potential['ehs2']:.1%}  |  "
+                   f"PPot: {potential['ppot']:.1%}  |  NPot: {potential['npot']:.1%}")
     if recommendation:
-        print(f"  Suggested: {recommendation}")
+        out.append(f"  Suggested: {recommendation}")
     human_pos = table.positions.get(human.name, "")
     pos_label = {"D": " (Dealer)", "S": " (Small Blind)", "B": " (Big Blind)"}.get(human_pos, "")
-    print(f"  Your chips: ${human.chips}{pos_label}")
+    out.append(f"  Your chips: ${human.chips}{pos_label}")
 
     if human.is_all_in:
-        print("  ** ALL-IN **")
-    print()
+        out.append("  ** ALL-IN **")
+    out.append("")
+    _screen.draw(out, force)
+
+
+def _stats_str(table, name, min_hands=10):
+    """Compact VPIP/PFR/AF over recent hands, once there is enough history."""
+    view = table.stats.view(name, "window")
+    if view is None or view["hands"] < min_hands:
+        return ""
+    return f"  [{view['vpip']:.0%}/{view['pfr']:.0%} AF {view['af']:.1f}]"
 
 
 def render_action(player_name, action, amount=0):
@@ -86,13 +164,31 @@ def render_action(player_name, action, amount=0):
         print(f"  >> {name} {'raise' if you else 'raises'} to ${amount}")
     elif action == "all-in":
         print(f"  >> {name} {'go' if you else 'goes'} ALL-IN for ${amount}")
+    _screen.note_output()
 
 
 def _is_you(name):
     return name.lower().strip() == "you"
 
 
+def render_runout(players, ladder):
+    """All-in equity ladder: every player's equity on each street of the runout."""
+    _screen.invalidate()
+    print("\n  -- All in: running it out --")
+    if ladder:
+        names = "  ".join(f"{p.name:>12s}" for p in players)
+        print(f"  {'':25s}{names}")
+        for board, equities in ladder:
+            street = {0: "Preflop", 3: "Flop", 4: "Turn"}[len(board)]
+            cards = pretty_cards(board)
+            # Pad on visible width; pretty cards carry ANSI color codes
+            pad = " " * (18 - 3 * len(board) - (not board))
+            row = "  ".join(f"{eq:12.1%}" for eq in equities)
+            print(f"  {street:7s} {cards}{pad}{row}")
+
+
 def render_showdown(awards, hands, board, total_pot):
+    _screen.invalidate()
     print("\n" + "=" * 60)
     print("  SHOWDOWN")
     print("=" * 60)
@@ -118,6 +214,7 @@ def render_showdown(awards, hands, board, total_pot):
 
 
 def render_winner_no_showdown(winner, pot):
+    _screen.note_output(3)
     print(f"\n  >> Everyone folds. {winner.name} {'win' if _is_you(winner.name) else 'wins'} ${pot}\n")
 
 
@@ -126,15 +223,34 @@ def render_elimination(player):
         print(f"  !! {player.name} have been eliminated !!")
     else:
         print(f"  !! {player.name} has been eliminated !!")
+    _screen.note_output()
 
 
-def render_chip_counts(players):
+def render_chip_counts(players, payouts=None):
+    """Standings; with payouts (prize-pool fractions), each stack's ICM share too."""
+    _screen.invalidate()
     print("\n  -- Chip Counts --")
     active = sorted([p for p in players if p.is_active], key=lambda p: -p.chips)
-    for i, p in enumerate(active, 1):
-        print(f"  {i}. {p.name:12s}  ${p.chips}")
+    if not payouts:
+        for i, p in enumerate(active, 1):
+            print(f"  {i}. {p.name:12s}  ${p.chips}")
+        print()
+        return
+    icm = icm_equities([p.chips for p in active], payouts)
+    for i, (p, eq) in enumerate(zip(active, icm), 1):
+        print(f"  {i}. {p.name:12s}  ${p.chips:<6}  ICM {eq:.1%}")
+    print()
+
+
+def render_forecast(players, forecast, paid=3):
+    """Win and top-`paid` probabilities from a forecast.Forecaster result."""
+    print(f"  -- Forecast ({forecast['rollouts']} rollouts) --")
+    rows = [(p, places) for p, places in zip(players, forecast["places"]) if p.is_active]
+    for p, places in sorted(rows, key=lambda r: -r[1][0]):
+        print(f"  {p.name:12s}  win {places[0]:6.1%}  top {paid} {sum(places[:paid]):6.1%}")
     print()
 
 
 def wait_for_enter(msg="Press Enter to continue..."):
     input(f"  {msg}")
+    _screen.note_output()
@@ -1,8 +1,13 @@
 import json
+import mmap
 import os
 import random
-from itertools import combinations
-from treys import Card, Evaluator
+import struct
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import combinations, permutations
+from math import comb
+from treys import Card, Deck, Evaluator
 
 _evaluator = Evaluator()
 
@@ -15,6 +20,127 @@ else:
 
 _RANK_ORDER = "AKQJT98765432"
 
+# Postflop sample sizes (see calibrate.py for their accuracy/latency trade-off)
+ENUMERATE_BOARDS_MAX = 500      # enumerate every runout up to this many, else sample
+BOARD_SAMPLES = 300             # sampled runouts against 1-2 opponents
+MULTIWAY_BOARD_SAMPLES = 150    # sampled runouts against 3+ opponents
+OPPONENT_COMBO_SAMPLES = 300    # opponent hand combos scored per runout
+RUNOUT_PREFLOP_SAMPLES = 2000   # sampled boards for the preflop step of an all-in ladder
+
+# Flop atlas written by precompute_flop_atlas.py: sorted uint32 spot keys
+# followed by uint16 fixed-point rows of equity vs 1-8 opponents, then
+# heads-up positive and negative potential.
+FLOP_ATLAS_MAGIC = b"PKRFLOP1"
+FLOP_ATLAS_HEADER = struct.Struct("<8sIII")  # magic, entries, opponents, fields
+FLOP_ATLAS_OPPONENTS = 8
+FLOP_ATLAS_FIELDS = FLOP_ATLAS_OPPONENTS + 2
+_FLOP_ATLAS_FILE = os.path.join(os.path.dirname(__file__), "flop_atlas.bin")
+
+_SUIT_INDEX = {1: 0, 2: 1, 4: 2, 8: 3}  # treys suit bits -> 0..3
+_SUIT_PERMUTATIONS = list(permutations(range(4)))
+
+
+def canonical_spot(hole_cards, board):
+    """Suit-isomorphic form of (hole, board) as a tuple of 0-51 card indices.
+
+    Hole and board are each sorted high to low; of the 24 suit relabelings,
+    the lexicographically smallest result is kept, so spots that differ only
+    by suit names share one key.
+    """
+    hole = [(Card.get_rank_int(c), _SUIT_INDEX[Card.get_suit_int(c)]) for c in hole_cards]
+    rest = [(Card.get_rank_int(c), _SUIT_INDEX[Card.get_suit_int(c)]) for c in board]
+    best = None
+    for perm in _SUIT_PERMUTATIONS:
+        key = (tuple(sorted((r * 4 + perm[s] for r, s in hole), reverse=True))
+               + tuple(sorted((r * 4 + perm[s] for r, s in rest), reverse=True)))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+def flop_atlas_key(hole_cards, flop):
+    """Pack the canonical (hole, flop) spot into a sortable 30-bit integer."""
+    key = 0
+    for c in canonical_spot(hole_cards, flop):
+        key = key * 64 + c
+    return key
+
+
+def spot_key(hole_cards, board, num_opponents):
+    """Nonzero 64-bit key for the suit-canonical (hole, board, opponents) spot.
+
+    Cards are packed as 1-52 in 6 bits each (0 marks an undealt board card),
+    followed by 4 bits of opponent count.
+    """
+    cards = canonical_spot(hole_cards, board)
+    key = 0
+    for i in range(7):
+        key = key * 64 + (cards[i] + 1 if i < len(cards) else 0)
+    return key * 16 + min(num_opponents, 15)
+
+
+# Optional cross-process cache (shared_cache.SharedEquityCache or anything
+# with get(key) -> float | None and put(key, value)), keyed by spot_key()
+_SHARED_CACHE = None
+
+
+def set_shared_cache(cache):
+    """Route postflop calculate_equity calls through cache (None disables it)."""
+    global _SHARED_CACHE
+    _SHARED_CACHE = cache
+
+
+# Optional persistent flop/turn store (equity_store.EquityStore or anything
+# with get(key, potential=False) -> (equity, samples, standard error[,
+# potential]) | None and merge(key, equity, samples, variance, potential=None)
+# -> (equity, samples, standard error)), keyed by spot_key()
+_EQUITY_STORE = None
+STORE_TRUSTED_SE = 0.003  # stored estimates this precise are not refined further
+
+
+def set_equity_store(store):
+    """Route flop and turn calculate_equity calls through store (None disables it)."""
+    global _EQUITY_STORE
+    _EQUITY_STORE = store
+
+
+def estimates_shared():
+    """True when postflop estimates go through the shared cache or equity store.
+
+    Repeat calls for a spot then return the merged (or cached) value, so
+    callers should not average them again.
+    """
+    return _SHARED_CACHE is not None or _EQUITY_STORE is not None
+
+
+def _load_flop_atlas(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, entries, opponents, fields = FLOP_ATLAS_HEADER.unpack_from(data, 0)
+    if magic != FLOP_ATLAS_MAGIC or fields != FLOP_ATLAS_FIELDS:
+        return None
+    view = memoryview(data)
+    start = FLOP_ATLAS_HEADER.size
+    keys = view[start:start + entries * 4].cast("I")
+    values = view[start + entries * 4:start + entries * (4 + fields * 2)].cast("H")
+    return keys, values
+
+
+_FLOP_ATLAS = _load_flop_atlas(_FLOP_ATLAS_FILE)
+
+
+def _flop_atlas_row(hole_cards, flop):
+    if _FLOP_ATLAS is None:
+        return None
+    keys, values = _FLOP_ATLAS
+    key = flop_atlas_key(hole_cards, flop)
+    idx = bisect_left(keys, key)
+    if idx == len(keys) or keys[idx] != key:
+        return None
+    return values[idx * FLOP_ATLAS_FIELDS:(idx + 1) * FLOP_ATLAS_FIELDS]
+
 
 def _hand_key(hole_cards):
     """Convert two treys card ints to canonical notation (e.g. 'AKs', 'TT', '97o')."""
@@ -47,67 +173,355 @@ def calculate_equity(hole_cards, community_cards, num_opponents, remaining_cards
         if key in table:
             return table[key]
 
+    # Rows start at one opponent; row[-1] would read the potential fields
+    if len(community_cards) == 3 and _FLOP_ATLAS is not None and num_opponents >= 1:
+        row = _flop_atlas_row(hole_cards, community_cards)
+        if row is not None:
+            return row[min(num_opponents, FLOP_ATLAS_OPPONENTS) - 1] / 65535
+
+    cache = _SHARED_CACHE
+    store = _EQUITY_STORE if len(community_cards) in (3, 4) else None
+    if cache is not None or store is not None:
+        key = spot_key(hole_cards, community_cards, num_opponents)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    stored = store.get(key) if store is not None else None
+    if stored is not None and stored[2] <= STORE_TRUSTED_SE:
+        equity = stored[0]
+        if cache is not None:
+            cache.put(key, equity)
+        return equity
+    equity, samples, variance = _equity_counted(hole_cards, community_cards, num_opponents, remaining_cards)
+    return _remember(hole_cards, community_cards, num_opponents, equity, samples, variance)
+
+
+def _remember(hole_cards, community_cards, num_opponents, equity, samples, variance,
+              potential=None):
+    """Fold a fresh estimate into the equity store and shared cache; return the equity to use.
+
+    potential (hs, ehs2, ppot, npot from the same pass) is stored with it.
+    """
+    cache = _SHARED_CACHE
+    store = _EQUITY_STORE if len(community_cards) in (3, 4) else None
+    if cache is None and store is None:
+        return equity
+    key = spot_key(hole_cards, community_cards, num_opponents)
+    if store is not None and samples:
+        # Refine: weighted mean with what earlier runs stored
+        equity = store.merge(key, equity, samples, variance, potential)[0]
+    if cache is not None:
+        cache.put(key, equity)
+    return equity
+
+
+def _equity_counted(hole_cards, community_cards, num_opponents, remaining_cards, potential=None):
+    """(equity, opponent hands scored, variance of the equity estimate).
+
+    Samples weight estimates when they are merged. The variance treats each
+    runout's share as a binomial proportion over its scored combos (exact
+    for heads-up, an approximation multiway, and without the finite-population
+    correction so it errs high); sampled runouts use the between-runout
+    spread instead, which includes the combo noise.
+    """
     board_needed = 5 - len(community_cards)
     remaining = list(remaining_cards)
 
     if board_needed == 0:
-        return _equity_fixed_board(hole_cards, community_cards, num_opponents, remaining)
+        return _equity_fixed_board(hole_cards, community_cards, num_opponents, remaining, potential)
 
     # Estimate enumeration size
-    from math import comb
     board_combos = comb(len(remaining), board_needed)
     # If too many combos, sample (fewer board draws for multi-way to stay fast)
-    if board_combos > 500:
-        sample_size = 150 if num_opponents > 2 else 300
-        return _equity_sampled(hole_cards, community_cards, num_opponents, remaining, board_needed, sample_size=sample_size)
+    if board_combos > ENUMERATE_BOARDS_MAX:
+        sample_size = MULTIWAY_BOARD_SAMPLES if num_opponents > 2 else BOARD_SAMPLES
+        return _equity_sampled(hole_cards, community_cards, num_opponents, remaining, board_needed, sample_size=sample_size, potential=potential)
 
     wins = 0
     ties = 0
     total = 0
+    spread = 0.0
+    # Zero when every opponent combo is scored on every runout
+    sampled = comb(len(remaining) - board_needed, 2) > OPPONENT_COMBO_SAMPLES
 
     for board_draw in combinations(remaining, board_needed):
         full_board = community_cards + list(board_draw)
         deck_after_board = [c for c in remaining if c not in board_draw]
-        w, t, n = _eval_against_opponents(hole_cards, full_board, num_opponents, deck_after_board)
+        w, t, n = _eval_against_opponents(hole_cards, full_board, num_opponents, deck_after_board, potential)
         wins += w
         ties += t
         total += n
+        if n:
+            p = (w + t / 2) / n
+            spread += n * p * (1 - p)
 
     if total == 0:
-        return 0.5
-    return (wins + ties / 2) / total
+        return 0.5, 0, 0.25
+    return (wins + ties / 2) / total, total, spread / total ** 2 if sampled else 0.0
 
 
-def _equity_sampled(hole_cards, community_cards, num_opponents, remaining, board_needed, sample_size=300):
+def _equity_sampled(hole_cards, community_cards, num_opponents, remaining, board_needed, sample_size=300, potential=None):
     wins = 0
     ties = 0
     total = 0
+    runouts = []
 
     for _ in range(sample_size):
         board_draw = random.sample(remaining, board_needed)
         full_board = community_cards + board_draw
         deck_after_board = [c for c in remaining if c not in board_draw]
-        w, t, n = _eval_against_opponents(hole_cards, full_board, num_opponents, deck_after_board)
+        w, t, n = _eval_against_opponents(hole_cards, full_board, num_opponents, deck_after_board, potential)
         wins += w
         ties += t
         total += n
+        runouts.append((w + t / 2, n))
 
     if total == 0:
-        return 0.5
-    return (wins + ties / 2) / total
+        return 0.5, 0, 0.25
+    equity = (wins + ties / 2) / total
+    # Ratio estimator over independent runouts (clusters of combos)
+    m = len(runouts)
+    spread = sum((x - equity * n) ** 2 for x, n in runouts)
+    variance = spread * m / (m - 1) / total ** 2 if m > 1 else 0.25
+    return equity, total, variance
+
+
+def _equity_fixed_board(hole_cards, board, num_opponents, remaining, potential=None):
+    hero_score = _evaluator.evaluate(list(board), list(hole_cards))
+    index = _river_index(board)
+    worse, tied, total = index.counts(hero_score, remaining)
+    if total == 0:
+        return 0.5, 0, 0.25
+    if potential is not None:
+        potential.add_river(worse, tied, total)
+    removal = index.removal(hero_score, remaining) if num_opponents > 1 else 0.0
+    # Every opponent combo is counted, so the estimate has no sampling error
+    return _multiway_share(total - worse - tied, tied, worse, num_opponents,
+                           len(remaining), removal), total, 0.0
 
 
-def _equity_fixed_board(hole_cards, board, num_opponents, remaining):
-    wins = 0
-    ties = 0
-    total = 0
-    w, t, n = _eval_against_opponents(hole_cards, board, num_opponents, remaining)
-    wins += w
-    ties += t
-    total += n
-    if total == 0:
-        return 0.5
-    return (wins + ties / 2) / total
+class _RiverIndex:
+    """Every two-card holding on a complete board, scored once and sorted.
+
+    Shared by all players at the board: a query removes the combos that use
+    dead cards (the hero's own, or any not in the caller's deck) with exact
+    inclusion-exclusion over per-card sorted score lists.
+    """
+
+    def __init__(self, board):
+        board_set = set(board)
+        self.live = [c for c in Deck.GetFullDeck() if c not in board_set]
+        self.pair_scores = {}
+        card_scores = {c: [] for c in self.live}
+        for a, b in combinations(self.live, 2):
+            score = _evaluator.evaluate(board, [a, b])
+            self.pair_scores[(a, b) if a < b else (b, a)] = score
+            card_scores[a].append(score)
+            card_scores[b].append(score)
+        self.scores = sorted(self.pair_scores.values())
+        self.card_scores = {c: sorted(v) for c, v in card_scores.items()}
+
+    @staticmethod
+    def _worse_and_tied(scores, hero_score):
+        lo = bisect_left(scores, hero_score)
+        hi = bisect_right(scores, hero_score)
+        return len(scores) - hi, hi - lo  # lower is better in treys
+
+    def counts(self, hero_score, remaining):
+        """(worse, tied, total) opponent combos drawn from the remaining cards."""
+        remaining = set(remaining)
+        dead = [c for c in self.live if c not in remaining]
+        worse, tied = self._worse_and_tied(self.scores, hero_score)
+        for c in dead:
+            w, t = self._worse_and_tied(self.card_scores[c], hero_score)
+            worse -= w
+            tied -= t
+        # Combos with two dead cards were subtracted twice
+        for a, b in combinations(dead, 2):
+            score = self.pair_scores[(a, b) if a < b else (b, a)]
+            if score > hero_score:
+                worse += 1
+            elif score == hero_score:
+                tied += 1
+        n = len(self.live) - len(dead)
+        return worse, tied, n * (n - 1) // 2
+
+    def removal(self, hero_score, remaining):
+        """Better combos destroyed by one non-better opponent hand (see _multiway_share).
+
+        Per-card counts ignore dead partner cards, a second-order effect.
+        """
+        better_by_card = {}
+        not_better_by_card = {}
+        for c in remaining:
+            scores = self.card_scores.get(c)
+            if scores is None:
+                continue
+            better = bisect_left(scores, hero_score)
+            better_by_card[c] = better
+            not_better_by_card[c] = len(scores) - better
+        return _removal_per_hand(better_by_card, not_better_by_card)
+
+
+_RIVER_INDEX_CACHE = OrderedDict()
+_RIVER_INDEX_CACHE_SIZE = 32
+
+
+def _river_index(board):
+    key = tuple(sorted(board))
+    index = _RIVER_INDEX_CACHE.get(key)
+    if index is None:
+        index = _RiverIndex(board)
+        _RIVER_INDEX_CACHE[key] = index
+        if len(_RIVER_INDEX_CACHE) > _RIVER_INDEX_CACHE_SIZE:
+            _RIVER_INDEX_CACHE.popitem(last=False)
+    else:
+        _RIVER_INDEX_CACHE.move_to_end(key)
+    return index
+
+
+def _removal_per_hand(better_by_card, not_better_by_card):
+    """Expected better-than-hero combos that share a card with one non-better hand."""
+    not_better_cards = sum(not_better_by_card.values())
+    if not_better_cards == 0:
+        return 0.0
+    # Each non-better combo is counted under both of its cards
+    return 2 * sum(better_by_card.get(c, 0) * n for c, n in not_better_by_card.items()) / not_better_cards
+
+
+def _multiway_share(better, tied, worse, num_opponents, deck_size, removal=0.0):
+    """Hero's pot share against num_opponents from counts over opponent combos.
+
+    better/tied/worse count two-card combos (all of them, or a sample) by
+    how they compare with hero. Opponents are dealt one after another: each
+    must avoid the better combos still left in the shrinking deck, and each
+    non-better hand already dealt removes `removal` better combos (same units
+    as the counts) because opponents compete for the same strong cards.
+    Among non-better lineups, k tying opponents split the pot k+1 ways.
+    Exact heads-up.
+    """
+    total = better + tied + worse
+    not_better = tied + worse
+    if not_better == 0:
+        return 0.0
+    scale = comb(deck_size, 2) / total
+    p_none_better = 1.0
+    remaining_better = better
+    for i in range(num_opponents):
+        pool = comb(deck_size - 2 * i, 2) / scale
+        if pool <= 0:
+            break
+        p_none_better *= max(0.0, 1.0 - remaining_better / pool)
+        remaining_better = max(0.0, remaining_better - removal)
+    q = tied / not_better
+    split = sum(comb(num_opponents, k) * q ** k * (1 - q) ** (num_opponents - k) / (k + 1)
+                for k in range(num_opponents + 1))
+    return p_none_better * split
+
+
+class _Potential:
+    """Heads-up hand potential counters filled in during an equity enumeration.
+
+    Every opponent combo the equity pass scores on a completed board is also
+    classified as ahead/tied/behind on the current board (scored once per
+    combo), so the potential costs one extra evaluation per distinct combo.
+    """
+
+    def __init__(self, hole_cards, board):
+        self.hole = list(hole_cards)
+        self.board = list(board)
+        self.hero_now = _evaluator.evaluate(self.board, self.hole)
+        self.now = {}                      # combo -> 0 ahead, 1 tied, 2 behind
+        self.hp = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]  # [now][final]
+        self.hs2 = 0.0
+        self.runouts = 0
+
+    def add(self, opp_hand, hero_score, opp_score):
+        now = self.now.get(opp_hand)
+        if now is None:
+            opp_now = _evaluator.evaluate(self.board, list(opp_hand))
+            now = self.now[opp_hand] = 0 if self.hero_now < opp_now else 1 if self.hero_now == opp_now else 2
+        final = 0 if hero_score < opp_score else 1 if hero_score == opp_score else 2
+        self.hp[now][final] += 1
+
+    def end_runout(self, strength):
+        self.hs2 += strength * strength
+        self.runouts += 1
+
+    def add_river(self, worse, tied, total):
+        # Complete board: nothing left to come, so strength is final
+        better = total - worse - tied
+        self.hp = [[worse, 0, 0], [0, tied, 0], [0, 0, better]]
+        self.end_runout((worse + tied / 2) / total)
+
+    def fields(self):
+        """hs, ehs2, ppot and npot measured so far (what the equity store keeps)."""
+        hp = self.hp
+        behind = sum(hp[2]) + sum(hp[1]) / 2
+        ahead = sum(hp[0]) + sum(hp[1]) / 2
+        hs = ahead / (ahead + behind) if ahead + behind else 0.5
+        return {
+            "hs": hs,
+            "ehs2": self.hs2 / self.runouts if self.runouts else hs * hs,
+            "ppot": (hp[2][0] + hp[2][1] / 2 + hp[1][0] / 2) / behind if behind else 0.0,
+            "npot": (hp[0][2] + hp[0][1] / 2 + hp[1][2] / 2) / ahead if ahead else 0.0,
+        }
+
+
+def _potential_result(equity, hs, ehs2, ppot, npot):
+    return {"equity": equity, "hs": hs, "ehs": hs * (1 - npot) + (1 - hs) * ppot,
+            "ehs2": ehs2, "ppot": ppot, "npot": npot}
+
+
+def calculate_potential(hole_cards, community_cards, num_opponents, remaining_cards):
+    """Equity plus heads-up hand potential from the same enumeration.
+
+    Returns a dict with equity (against num_opponents, as calculate_equity),
+    hs (strength against one random hand now), ehs, ehs2, ppot and npot, or
+    None preflop. On the flop the atlas supplies equity and potential when
+    it is loaded; ehs2 then falls back to hs squared. Otherwise a trusted
+    equity store entry that also holds potential is served without a pass;
+    failing that, the pass's equity and potential are merged into the store
+    (and the equity into the shared cache) like calculate_equity's, and the
+    merged equity is returned. The shared cache holds equity only, so a
+    cache hit alone cannot skip the pass.
+    """
+    if not community_cards:
+        return None
+    potential = _Potential(hole_cards, community_cards)
+    # Rows start at one opponent; row[-1] would read the potential fields
+    if len(community_cards) == 3 and _FLOP_ATLAS is not None and num_opponents >= 1:
+        row = _flop_atlas_row(hole_cards, community_cards)
+        if row is not None:
+            deck = [c for c in remaining_cards if c not in hole_cards]
+            worse = tied = 0
+            for opp_hand in combinations(deck, 2):
+                opp_now = _evaluator.evaluate(potential.board, list(opp_hand))
+                worse += potential.hero_now < opp_now
+                tied += potential.hero_now == opp_now
+            total = comb(len(deck), 2)
+            hs = (worse + tied / 2) / total if total else 0.5
+            return _potential_result(row[min(num_opponents, FLOP_ATLAS_OPPONENTS) - 1] / 65535,
+                                     hs, hs * hs, row[FLOP_ATLAS_OPPONENTS] / 65535,
+                                     row[FLOP_ATLAS_OPPONENTS + 1] / 65535)
+
+    store = _EQUITY_STORE if len(community_cards) in (3, 4) else None
+    if store is not None:
+        key = spot_key(hole_cards, community_cards, num_opponents)
+        stored = store.get(key, potential=True)
+        if stored is not None and stored[2] <= STORE_TRUSTED_SE and stored[3] is not None:
+            if _SHARED_CACHE is not None:
+                _SHARED_CACHE.put(key, stored[0])
+            return _potential_result(stored[0], **stored[3])
+    equity, samples, variance = _equity_counted(hole_cards, community_cards, num_opponents,
+                                                remaining_cards, potential)
+    # The pass is needed for the potential anyway; its equity refines the stored spot
+    fields = potential.fields()
+    equity = _remember(hole_cards, community_cards, num_opponents, equity, samples, variance,
+                       fields)
+    return _potential_result(equity, **fields)
 
 
 def calculate_all_equities(hands, community_cards, remaining_cards, sample_size=300):
@@ -124,88 +538,182 @@ def calculate_all_equities(hands, community_cards, remaining_cards, sample_size=
     """
     if len(hands) < 2:
         return {hands[0][0]: 1.0} if hands else {}
+    scores = score_runouts([h for _, h in hands], community_cards, remaining_cards, sample_size)
+    shares = pot_shares(scores, range(len(hands)))
+    return {name: share for (name, _), share in zip(hands, shares)}
 
-    board_needed = 5 - len(community_cards)
-    remaining = [c for c in remaining_cards
-                 if not any(c in h for _, h in hands)]
 
-    if board_needed == 0:
-        return _multiway_equity_fixed(hands, community_cards)
+_RUNOUT_SCORES_CACHE = OrderedDict()
+_RUNOUT_SCORES_CACHE_SIZE = 32
 
-    from math import comb
 
-    board_combos_count = comb(len(remaining), board_needed)
-    if board_combos_count <= sample_size:
-        boards = list(combinations(remaining, board_needed))
+def score_runouts(hands, community_cards, remaining_cards, sample_size=300):
+    """Score every known hand on each runout of the board, once.
+
+    Runouts are enumerated when there are at most sample_size of them and
+    sampled otherwise. Returns a list with one tuple of scores (one per hand,
+    lower is better) per runout; cached per (hands, board), so equities for
+    any subset of the hands (pairwise, multiway, per side pot) come from the
+    same evaluations.
+    """
+    key = (tuple(tuple(sorted(h)) for h in hands), tuple(sorted(community_cards)))
+    scores = _RUNOUT_SCORES_CACHE.get(key)
+    if scores is not None:
+        _RUNOUT_SCORES_CACHE.move_to_end(key)
+        return scores
+
+    board = list(community_cards)
+    board_needed = 5 - len(board)
+    remaining = [c for c in remaining_cards if not any(c in h for h in hands)]
+    if comb(len(remaining), board_needed) <= sample_size:
+        boards = combinations(remaining, board_needed)
     else:
-        boards = [tuple(random.sample(remaining, board_needed))
-                  for _ in range(sample_size)]
+        boards = (random.sample(remaining, board_needed) for _ in range(sample_size))
+    scores = [tuple(_evaluator.evaluate(full, list(h)) for h in hands)
+              for full in (board + list(draw) for draw in boards)]
+
+    _RUNOUT_SCORES_CACHE[key] = scores
+    if len(_RUNOUT_SCORES_CACHE) > _RUNOUT_SCORES_CACHE_SIZE:
+        _RUNOUT_SCORES_CACHE.popitem(last=False)
+    return scores
+
+
+def pot_shares(scores, eligible):
+    """Each hand's expected share of a pot contested by the `eligible` hand indices."""
+    eligible = list(eligible)
+    shares = [0.0] * (len(scores[0]) if scores else 0)
+    for row in scores:
+        best = min(row[i] for i in eligible)
+        winners = [i for i in eligible if row[i] == best]
+        for i in winners:
+            shares[i] += 1.0 / len(winners)
+    return [share / len(scores) for share in shares] if scores else shares
+
+
+def equity_matrix(hands, community_cards, remaining_cards, sample_size=300):
+    """Multiway equities and the N x N pairwise equity matrix from one set of runouts.
+
+    matrix[i][j] is hand i's heads-up equity against hand j (None on the
+    diagonal). Each runout scores every hand once; the N^2 comparisons
+    reuse those scores.
+    """
+    scores = score_runouts(hands, community_cards, remaining_cards, sample_size)
+    n = len(hands)
+    multiway = pot_shares(scores, range(n))
+    wins = [[0.0] * n for _ in range(n)]
+    for row in scores:
+        for i in range(n):
+            si = row[i]
+            for j in range(i + 1, n):
+                sj = row[j]
+                if si < sj:
+                    wins[i][j] += 1
+                elif si > sj:
+                    wins[j][i] += 1
+                else:
+                    wins[i][j] += 0.5
+                    wins[j][i] += 0.5
+    total = len(scores) or 1
+    matrix = [[None if i == j else wins[i][j] / total for j in range(n)] for i in range(n)]
+    return multiway, matrix
+
+
+def runout_ladder(hands, board, runout, remaining_cards, samples=RUNOUT_PREFLOP_SAMPLES):
+    """Equity of each known hand at every street an all-in runout passes through.
 
-    wins = {name: 0.0 for name, _ in hands}
-    total = len(boards)
+    Args:
+        hands: hole cards of each player in the hand
+        board: community cards when the betting ended
+        runout: the cards that complete the board, in deal order
+        remaining_cards: other unseen cards
 
-    for board_draw in boards:
-        full_board = community_cards + list(board_draw)
-        scores = []
-        for name, hole in hands:
-            score = _evaluator.evaluate(full_board, hole)
-            scores.append((name, score))
-        best = min(s for _, s in scores)
-        winners = [name for name, s in scores if s == best]
-        share = 1.0 / len(winners)
-        for name in winners:
-            wins[name] += share
-
-    return {name: wins[name] / total for name, _ in hands}
-
-
-def _multiway_equity_fixed(hands, board):
-    scores = []
-    for name, hole in hands:
-        score = _evaluator.evaluate(board, hole)
-        scores.append((name, score))
-    best = min(s for _, s in scores)
-    winners = [name for name, s in scores if s == best]
-    share = 1.0 / len(winners)
-    return {name: (share if name in winners else 0.0) for name, _ in hands}
-
-
-def _eval_against_opponents(hole_cards, board, num_opponents, deck):
+    Returns:
+        [(board_cards, [equity per hand])] for the current board and each
+        later street before the river.
+
+    From the flop on, one pass enumerates every completion of the earliest
+    known flop; later streets reuse the completions containing their dealt
+    cards. Preflop is sampled (there are ~1.7M boards).
+    """
+    full = list(board) + list(runout)
+    used = {c for h in hands for c in h} | set(full)
+    unseen = [c for c in remaining_cards if c not in used]
+    lengths = sorted({len(board)} | {n for n in (3, 4) if n > len(board)})
+    ladder = {n: [0.0] * len(hands) for n in lengths}
+    counts = dict.fromkeys(lengths, 0)
+
+    base_len = max(len(board), 3)
+    base = full[:base_len]
+    pool = unseen + full[base_len:]
+    exact = [(n, set(full[base_len:n])) for n in lengths if n >= base_len]
+    for draw in combinations(pool, 5 - base_len):
+        shares = _runout_shares(hands, base + list(draw))
+        for n, dealt in exact:
+            if dealt.issubset(draw):
+                counts[n] += 1
+                totals = ladder[n]
+                for i, share in enumerate(shares):
+                    totals[i] += share
+
+    if len(board) < 3:
+        pool = unseen + full[len(board):]
+        for _ in range(samples):
+            shares = _runout_shares(hands, list(board) + random.sample(pool, 5 - len(board)))
+            totals = ladder[len(board)]
+            for i, share in enumerate(shares):
+                totals[i] += share
+        counts[len(board)] = samples
+
+    return [(full[:n], [t / counts[n] for t in ladder[n]]) for n in lengths]
+
+
+def _runout_shares(hands, full_board):
+    scores = [_evaluator.evaluate(full_board, hole) for hole in hands]
+    best = min(scores)
+    winners = scores.count(best)
+    return [1.0 / winners if s == best else 0.0 for s in scores]
+
+
+def _eval_against_opponents(hole_cards, board, num_opponents, deck, potential=None):
     """Count hero wins/ties against num_opponents simultaneous opponents.
 
-    For 1 opponent, enumerates hand combos (capped for speed).
-    For multiple opponents, samples complete lineups so hero must beat all of them.
+    Scores hero against the opponent hand combos once (capped for speed).
+    For multiple opponents the combo counts are turned into the share of
+    beating all of them with _multiway_share, so the cost does not grow with
+    the number of opponents. That share is returned as share-weighted wins
+    over the same total, so callers can keep summing counts.
     """
+    if len(deck) < num_opponents * 2:
+        return 1, 0, 1
     hero_score = _evaluator.evaluate(board, hole_cards)
     wins = 0
     ties = 0
     total = 0
-
-    if num_opponents == 1:
-        opponent_combos = list(combinations(deck, 2))
-        if len(opponent_combos) > 300:
-            opponent_combos = random.sample(opponent_combos, 300)
-        for opp_hand in opponent_combos:
-            opp_score = _evaluator.evaluate(board, list(opp_hand))
-            total += 1
-            if hero_score < opp_score:  # lower is better in treys
-                wins += 1
-            elif hero_score == opp_score:
-                ties += 1
-    else:
-        cards_needed = num_opponents * 2
-        if len(deck) < cards_needed:
-            return 1, 0, 1
-        for _ in range(100):
-            drawn = random.sample(deck, cards_needed)
-            best_opp = min(
-                _evaluator.evaluate(board, drawn[i * 2: i * 2 + 2])
-                for i in range(num_opponents)
-            )
-            total += 1
-            if hero_score < best_opp:
-                wins += 1
-            elif hero_score == best_opp:
-                ties += 1
-
-    return wins, ties, total
+    multiway = num_opponents > 1
+    better_by_card = {}
+    not_better_by_card = {}
+
+    opponent_combos = list(combinations(deck, 2))
+    if len(opponent_combos) > OPPONENT_COMBO_SAMPLES:
+        opponent_combos = random.sample(opponent_combos, OPPONENT_COMBO_SAMPLES)
+    for opp_hand in opponent_combos:
+        opp_score = _evaluator.evaluate(board, list(opp_hand))
+        total += 1
+        if hero_score < opp_score:  # lower is better in treys
+            wins += 1
+        elif hero_score == opp_score:
+            ties += 1
+        if multiway:
+            counts = better_by_card if opp_score < hero_score else not_better_by_card
+            for c in opp_hand:
+                counts[c] = counts.get(c, 0) + 1
+        if potential is not None:
+            potential.add(opp_hand, hero_score, opp_score)
+
+    if potential is not None and total:
+        potential.end_runout((wins + ties / 2) / total)
+    if not multiway or total == 0:
+        return wins, ties, total
+    removal = _removal_per_hand(better_by_card, not_better_by_card)
+    share = _multiway_share(total - wins - ties, ties, wins, num_opponents, len(deck), removal)
+    return share * total, 0, total
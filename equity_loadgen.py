@@ -0,0 +1,160 @@
+"""Load generator for equity_server.py.
+
+Replays a realistic query mix against a running equity server and reports
+throughput and client-side latency percentiles. Game processes ask about the
+same spot several times per street (once per action), so a share of queries
+repeat recently seen spots; the rest are fresh deals.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from equity_server import DEFAULT_PORT, percentile
+
+RANKS = "23456789TJQKA"
+SUITS = "shdc"
+DECK = [r + s for r in RANKS for s in SUITS]
+
+# Share of queries per street, roughly matching a 9-handed tournament
+STREET_MIX = [(0, 0.40), (3, 0.30), (4, 0.18), (5, 0.12)]
+# Opponents still in the hand, weighted toward short-handed postflop pots
+OPPONENT_MIX = [(1, 0.35), (2, 0.25), (3, 0.15), (4, 0.10), (5, 0.06),
+                (6, 0.04), (7, 0.03), (8, 0.02)]
+
+
+def _weighted(choices, rng):
+    roll = rng.random()
+    acc = 0.0
+    for value, weight in choices:
+        acc += weight
+        if roll < acc:
+            return value
+    return choices[-1][0]
+
+
+def random_spot(rng):
+    cards = rng.sample(DECK, 7)
+    board_len = _weighted(STREET_MIX, rng)
+    opponents = _weighted(OPPONENT_MIX, rng)
+    if board_len > 0:
+        opponents = min(opponents, 4)
+    return {"hole": cards[:2], "board": cards[2:2 + board_len], "opponents": opponents}
+
+
+class QueryMix:
+    """Stream of spots where repeat_rate of queries revisit a recent spot."""
+
+    def __init__(self, repeat_rate=0.6, recent=200, seed=None):
+        self.rng = random.Random(seed)
+        self.repeat_rate = repeat_rate
+        self.recent = []
+        self.max_recent = recent
+
+    def next(self):
+        if self.recent and self.rng.random() < self.repeat_rate:
+            return self.rng.choice(self.recent)
+        spot = random_spot(self.rng)
+        self.recent.append(spot)
+        if len(self.recent) > self.max_recent:
+            self.recent.pop(0)
+        return spot
+
+
+async def _open(args):
+    if args.socket:
+        return await asyncio.open_unix_connection(args.socket)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def _client(args, mix, latencies, errors, deadline, pipeline):
+    reader, writer = await _open(args)
+    sent = {}
+    next_id = 0
+    lock = asyncio.Semaphore(pipeline)
+
+    async def read_replies():
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            reply = json.loads(line)
+            start = sent.pop(reply.get("id"), None)
+            if start is not None:
+                latencies.append(time.monotonic() - start)
+            if "error" in reply:
+                errors.append(reply["error"])
+            lock.release()
+
+    reader_task = asyncio.create_task(read_replies())
+    try:
+        while time.monotonic() < deadline:
+            await lock.acquire()
+            msg = dict(mix.next(), id=next_id)
+            sent[next_id] = time.monotonic()
+            next_id += 1
+            writer.write((json.dumps(msg) + "\n").encode())
+            await writer.drain()
+        # Wait for outstanding replies
+        while sent and not reader_task.done():
+            await asyncio.sleep(0.01)
+    finally:
+        reader_task.cancel()
+        writer.close()
+
+
+async def _server_stats(args):
+    reader, writer = await _open(args)
+    writer.write(b'{"id": "stats", "op": "stats"}\n')
+    await writer.drain()
+    reply = json.loads(await reader.readline())
+    writer.close()
+    return reply.get("stats", {})
+
+
+async def run(args):
+    mix = QueryMix(repeat_rate=args.repeat_rate, seed=args.seed)
+    latencies = []
+    errors = []
+    start = time.monotonic()
+    deadline = start + args.duration
+    await asyncio.gather(*(
+        _client(args, mix, latencies, errors, deadline, args.pipeline)
+        for _ in range(args.clients)
+    ))
+    elapsed = time.monotonic() - start
+
+    lat = sorted(latencies)
+    print(f"\n  {len(lat)} replies in {elapsed:.1f}s  ({len(lat) / elapsed:.1f} req/s)  "
+          f"{args.clients} clients x {args.pipeline} in flight")
+    for p in (50, 90, 99, 100):
+        print(f"  p{p:<3d} {percentile(lat, p) * 1000:9.2f} ms")
+    if errors:
+        print(f"  {len(errors)} errors, first: {errors[0]}")
+
+    stats = await _server_stats(args)
+    print(f"\n  Server: {stats.get('evaluations', 0)} evaluations, "
+          f"{stats.get('cache_hits', 0)} cache hits, "
+          f"mean batch {stats.get('mean_batch', 0):.1f}")
+    print(f"  Server latency: {stats.get('latency_ms')}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a query mix against equity_server.py")
+    parser.add_argument("--socket", default=None, help="Unix socket path; TCP if omitted")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent connections")
+    parser.add_argument("--pipeline", type=int, default=4, help="requests in flight per client")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--repeat-rate", type=float, default=0.6,
+                        help="share of queries that revisit a recent spot")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
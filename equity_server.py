@@ -0,0 +1,292 @@
+"""Long-running local equity service.
+
+Several game processes and analysis tools can share one warm evaluator and
+one result cache by talking to this server over a Unix socket or localhost
+TCP. The protocol is newline-delimited JSON:
+
+    {"id": 1, "hole": ["As", "Kd"], "board": ["7h", "8h", "2c"], "opponents": 2}
+    -> {"id": 1, "equity": 0.4312, "cached": false}
+
+    {"id": 2, "op": "stats"}
+    -> {"id": 2, "stats": {...latency percentiles, batch sizes, cache hits...}}
+
+An optional "dead" list removes extra known cards from the deck.
+
+Concurrent requests are pulled off a bounded queue and combined into
+batches. Identical spots inside a batch (and spots already in the cache) are
+evaluated once. When the queue is full, request tasks wait to enqueue; once
+a connection has queue_size requests in flight its reader stops reading,
+which pushes backpressure onto that client's socket.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from treys import Card, Deck as TreysDeck
+
+from equity import calculate_equity
+
+DEFAULT_SOCKET = "/tmp/pkr-eq-equity.sock"
+DEFAULT_PORT = 8765
+QUEUE_SIZE = 1024       # pending requests before readers block
+BATCH_SIZE = 64         # max requests combined into one batch
+BATCH_WINDOW = 0.002    # seconds to wait for a batch to fill
+CACHE_SIZE = 50000      # results kept in the LRU cache
+LATENCY_WINDOW = 10000  # recent latencies kept for percentiles
+
+_FULL_DECK = TreysDeck.GetFullDeck()
+_CARD_STRS = {Card.int_to_str(c) for c in _FULL_DECK}
+
+
+def request_key(hole, board, opponents, dead=()):
+    """Validate a request and normalize it into a hashable cache key of card strings."""
+    hole, board, dead = list(hole), list(board), list(dead)
+    opponents = int(opponents)
+    if len(hole) != 2:
+        raise ValueError(f"need 2 hole cards, got {len(hole)}")
+    if len(board) > 5:
+        raise ValueError(f"board has {len(board)} cards, at most 5 allowed")
+    if opponents < 1:
+        raise ValueError(f"opponents must be at least 1, got {opponents}")
+    cards = hole + board + dead
+    for c in cards:
+        if c not in _CARD_STRS:
+            raise ValueError(f"invalid card {c!r}")
+    if len(set(cards)) != len(cards):
+        raise ValueError("duplicate cards")
+    if len(_FULL_DECK) - len(cards) < 5 - len(board) + 2 * opponents:
+        raise ValueError("not enough cards left for the opponents and the runout")
+    return (
+        tuple(sorted(hole)),
+        tuple(sorted(board)),
+        opponents,
+        tuple(sorted(dead)),
+    )
+
+
+def _evaluate_spot(key):
+    hole, board, opponents, dead = key
+    hole_cards = [Card.new(c) for c in hole]
+    board_cards = [Card.new(c) for c in board]
+    known = set(hole_cards) | set(board_cards) | {Card.new(c) for c in dead}
+    remaining = [c for c in _FULL_DECK if c not in known]
+    return calculate_equity(hole_cards, board_cards, opponents, remaining)
+
+
+def _evaluate_batch(keys):
+    """[(equity, None) or (None, exception)] per key, so one bad spot fails alone."""
+    results = []
+    for k in keys:
+        try:
+            results.append((_evaluate_spot(k), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class EquityServer:
+    def __init__(self, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 batch_window=BATCH_WINDOW, cache_size=CACHE_SIZE):
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.cache_size = cache_size
+        self.queue_size = queue_size
+        self.queue = None
+        self.cache = OrderedDict()
+        # One worker thread owns the evaluator so the event loop stays responsive
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.cache_hits = 0
+        self.evaluations = 0
+        self.started = time.monotonic()
+
+    def _cache_get(self, key):
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        return None
+
+    def _cache_put(self, key, value):
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def _next_batch(self):
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            self.batch_sizes.append(len(batch))
+
+            pending = {}
+            for key, future, _ in batch:
+                cached = self._cache_get(key)
+                if cached is not None:
+                    self.cache_hits += 1
+                    if not future.done():
+                        future.set_result((cached, True))
+                else:
+                    pending.setdefault(key, []).append(future)
+
+            if pending:
+                keys = list(pending)
+                results = await loop.run_in_executor(self.executor, _evaluate_batch, keys)
+                self.evaluations += len(keys)
+                for key, (value, error) in zip(keys, results):
+                    if error is None:
+                        self._cache_put(key, value)
+                    for future in pending[key]:
+                        if future.done():
+                            continue
+                        if error is None:
+                            future.set_result((value, False))
+                        else:
+                            future.set_exception(error)
+
+            now = time.monotonic()
+            for _, _, enqueued in batch:
+                self.latencies.append(now - enqueued)
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        sizes = list(self.batch_sizes)
+        elapsed = time.monotonic() - self.started
+        return {
+            "requests": self.requests,
+            "evaluations": self.evaluations,
+            "cache_hits": self.cache_hits,
+            "cache_entries": len(self.cache),
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "mean_batch": sum(sizes) / len(sizes) if sizes else 0.0,
+            "throughput": self.requests / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": {
+                f"p{p}": round(percentile(lat, p) * 1000, 3) for p in (50, 90, 99, 100)
+            },
+        }
+
+    async def _handle_request(self, msg):
+        if not isinstance(msg, dict):
+            return {"id": None, "error": "bad request: expected a JSON object"}
+        if msg.get("op") == "stats":
+            return {"id": msg.get("id"), "stats": self.stats()}
+        try:
+            key = request_key(msg["hole"], msg.get("board", []),
+                           msg["opponents"], msg.get("dead", []))
+        except (KeyError, TypeError, ValueError) as e:
+            return {"id": msg.get("id"), "error": f"bad request: {e}"}
+        self.requests += 1
+        future = asyncio.get_running_loop().create_future()
+        # Blocks when the queue is full, which stops this connection reading
+        await self.queue.put((key, future, time.monotonic()))
+        try:
+            equity, cached = await future
+        except Exception as e:
+            return {"id": msg.get("id"), "error": str(e)}
+        return {"id": msg.get("id"), "equity": equity, "cached": cached}
+
+    async def _handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(msg):
+            reply = await self._handle_request(msg)
+            async with write_lock:
+                writer.write((json.dumps(reply) + "\n").encode())
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                except json.JSONDecodeError:
+                    async with write_lock:
+                        writer.write(b'{"error": "invalid json"}\n')
+                        await writer.drain()
+                    continue
+                # Bound in-flight requests per connection as well
+                while len(tasks) >= self.queue_size:
+                    await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                task = asyncio.create_task(respond(msg))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=None, host="127.0.0.1", port=DEFAULT_PORT):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        batcher = asyncio.create_task(self._batcher())
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = await asyncio.start_unix_server(self._handle_connection, path=socket_path)
+            where = socket_path
+        else:
+            server = await asyncio.start_server(self._handle_connection, host, port)
+            where = f"{host}:{port}"
+        print(f"  Equity server listening on {where}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.executor.shutdown(wait=False)
+            if socket_path and os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared local equity service")
+    parser.add_argument("--socket", default=None,
+                        help=f"Unix socket path (e.g. {DEFAULT_SOCKET}); TCP if omitted")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--batch-window", type=float, default=BATCH_WINDOW)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    args = parser.parse_args()
+
+    server = EquityServer(queue_size=args.queue_size, batch_size=args.batch_size,
+                          batch_window=args.batch_window, cache_size=args.cache_size)
+    try:
+        asyncio.run(server.serve(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
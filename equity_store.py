@@ -0,0 +1,205 @@
+"""Persistent flop/turn equity store that warms up across sessions.
+
+An SQLite table keyed by equity.spot_key() (suit-canonical hole, board and
+opponent count) holding the equity estimate, how many opponent hands it was
+measured over, and the variance of the estimate. A new estimate for a stored
+spot is merged in weighted by sample count (the variances combine as for any
+weighted mean of independent estimates), so repeated visits refine the
+entry, and once its standard error is down to equity.STORE_TRUSTED_SE it is
+served without recomputing. The sample count alone would overstate the
+precision: the opponent hands of one pass share a few runouts.
+
+Passes that also measured heads-up hand potential (equity.calculate_potential)
+store it next to the equity: hs, ehs2, ppot and npot, each a mean weighted
+by the samples of the passes that supplied it. A trusted spot with potential
+then skips the potential pass as well.
+
+Writes are buffered and committed in batches inside one transaction in WAL
+mode: a crash loses at most the uncommitted batch, never the database. The
+upsert merges with the row as committed, so concurrent sessions sharing one
+file refine rather than overwrite each other. Past max_entries, the least
+recently used spots are evicted. Lookups are batched the same way and
+flushed after TOUCH_FLUSH distinct spots, so a read-mostly session does not
+buffer without bound.
+
+    store = EquityStore(default_path())
+    equity.set_equity_store(store)
+    ...
+    store.close()
+"""
+
+import math
+import os
+import sqlite3
+import threading
+
+DEFAULT_MAX_ENTRIES = 2_000_000   # ~100 MB on disk
+COMMIT_EVERY = 64                 # buffered writes per transaction
+TOUCH_FLUSH = 4096                # buffered lookups (LRU updates) per transaction
+EVICT_SLACK = 0.1                 # evict down to 90% of the cap
+
+POTENTIAL_FIELDS = ("hs", "ehs2", "ppot", "npot")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS equity (
+    key INTEGER PRIMARY KEY,
+    equity REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    variance REAL NOT NULL,
+    used INTEGER NOT NULL,
+    pweight INTEGER NOT NULL,
+    hs REAL NOT NULL,
+    ehs2 REAL NOT NULL,
+    ppot REAL NOT NULL,
+    npot REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS equity_used ON equity (used);
+"""
+
+_UPSERT = """
+INSERT INTO equity (key, equity, samples, variance, used, pweight, hs, ehs2, ppot, npot)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    equity = (equity * samples + excluded.equity * excluded.samples) / (samples + excluded.samples),
+    variance = (variance * samples * samples + excluded.variance * excluded.samples * excluded.samples)
+               / ((samples + excluded.samples) * (samples + excluded.samples)),
+    samples = samples + excluded.samples,
+    used = max(used, excluded.used),
+    hs = coalesce((hs * pweight + excluded.hs * excluded.pweight) / nullif(pweight + excluded.pweight, 0), 0),
+    ehs2 = coalesce((ehs2 * pweight + excluded.ehs2 * excluded.pweight) / nullif(pweight + excluded.pweight, 0), 0),
+    ppot = coalesce((ppot * pweight + excluded.ppot * excluded.pweight) / nullif(pweight + excluded.pweight, 0), 0),
+    npot = coalesce((npot * pweight + excluded.npot * excluded.pweight) / nullif(pweight + excluded.pweight, 0), 0),
+    pweight = pweight + excluded.pweight
+"""
+
+
+_EMPTY = (0.0, 0, 0.0, 0, (0.0,) * len(POTENTIAL_FIELDS))
+
+
+def default_path():
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "pkr-eq", "equity.sqlite3")
+
+
+class EquityStore:
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, commit_every=COMMIT_EVERY):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.commit_every = commit_every
+        self._lock = threading.Lock()  # one connection, shareable across threads
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(equity)")}
+        if columns and not {"variance", "pweight"} <= columns:
+            # Written before variances or potential were kept; it is only a cache, so start over
+            self._db.execute("DROP TABLE equity")
+        self._db.executescript(_SCHEMA)
+        self._clock = self._db.execute("SELECT coalesce(max(used), 0) FROM equity").fetchone()[0]
+        self._entries = self._db.execute("SELECT count(*) FROM equity").fetchone()[0]
+        # key -> (sum of w * equity, sum of w, sum of w^2 * variance,
+        #         sum of u, [sum of u * field for POTENTIAL_FIELDS]), w = samples,
+        #         u = samples of the passes that measured potential
+        self._pending = {}
+        self._touched = {}   # key -> last use, for LRU
+        self.hits = 0
+        self.misses = 0
+
+    def _row(self, key):
+        row = self._db.execute("SELECT equity, samples, variance, pweight, hs, ehs2, ppot, npot "
+                               "FROM equity WHERE key = ?", (key,)).fetchone()
+        weighted, samples, spread, pweight, fields = self._pending.get(key, _EMPTY)
+        fields = list(fields)
+        if row is not None:
+            weighted += row[0] * row[1]
+            samples += row[1]
+            spread += row[2] * row[1] * row[1]
+            pweight += row[3]
+            for i, value in enumerate(row[4:]):
+                fields[i] += value * row[3]
+        if not samples:
+            return None
+        potential = dict(zip(POTENTIAL_FIELDS, (f / pweight for f in fields))) if pweight else None
+        return weighted / samples, samples, math.sqrt(spread) / samples, potential
+
+    def get(self, key, potential=False):
+        """(equity, samples, standard error) for a spot, or None.
+
+        With potential=True the tuple also carries the stored potential, a
+        dict of POTENTIAL_FIELDS (None if no pass for the spot measured it).
+        """
+        with self._lock:
+            row = self._row(key)
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._clock += 1
+            self._touched[key] = self._clock
+            if len(self._touched) >= TOUCH_FLUSH:
+                self._flush()
+            return row if potential else row[:3]
+
+    def merge(self, key, equity, samples, variance, potential=None):
+        """Fold in a new estimate (with its variance); return the merged (equity, samples, se).
+
+        potential, a mapping with POTENTIAL_FIELDS from the same pass, is
+        merged with the same weight.
+        """
+        with self._lock:
+            weighted, total, spread, pweight, fields = self._pending.get(key, _EMPTY)
+            if potential is not None:
+                fields = tuple(f + potential[name] * samples
+                               for f, name in zip(fields, POTENTIAL_FIELDS))
+                pweight += samples
+            self._pending[key] = (weighted + equity * samples, total + samples,
+                                  spread + variance * samples * samples, pweight, fields)
+            self._clock += 1
+            self._touched[key] = self._clock
+            merged = self._row(key)[:3]
+            if len(self._pending) >= self.commit_every or len(self._touched) >= TOUCH_FLUSH:
+                self._flush()
+            return merged
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending and not self._touched:
+            return
+        with self._db:  # one transaction: all of the batch or none of it
+            for key, (weighted, samples, spread, pweight, fields) in self._pending.items():
+                exists = self._db.execute("SELECT 1 FROM equity WHERE key = ?", (key,)).fetchone()
+                self._db.execute(_UPSERT, (key, weighted / samples, samples,
+                                           spread / (samples * samples), self._touched[key],
+                                           pweight, *(f / pweight if pweight else 0.0
+                                                      for f in fields)))
+                if exists is None:
+                    self._entries += 1
+            self._db.executemany("UPDATE equity SET used = max(used, ?) WHERE key = ?",
+                                 [(used, key) for key, used in self._touched.items()
+                                  if key not in self._pending])
+            if self._entries > self.max_entries:
+                excess = self._entries - int(self.max_entries * (1 - EVICT_SLACK))
+                self._db.execute("DELETE FROM equity WHERE key IN "
+                                 "(SELECT key FROM equity ORDER BY used LIMIT ?)", (excess,))
+                self._entries = self._db.execute("SELECT count(*) FROM equity").fetchone()[0]
+        self._pending.clear()
+        self._touched.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": self._entries, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def close(self):
+        with self._lock:
+            if self._db is None:
+                return
+            self._flush()
+            self._db.close()
+            self._db = None
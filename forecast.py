@@ -0,0 +1,162 @@
+"""Tournament outcome forecaster by fast rollout of the remaining tournament.
+
+Each rollout plays the rest of the tournament with a cheap hand model: the
+blinds move around and escalate on the real schedule; with probability
+ALLIN_RATE a hand is an all-in between a shover (short stacks shove more
+often) and a random caller, decided by a coin flip; otherwise a random
+player picks up the blinds. Finish orders are tallied into each player's
+place distribution.
+
+Rollouts run on a persistent process pool until a time budget expires.
+Every forecast starts from scratch. Callers ask once per hand, and stacks,
+button or blinds change between hands, so earlier rollouts describe a
+different state and are not reused.
+"""
+
+import argparse
+import os
+import random
+import time
+from bisect import bisect_right
+from multiprocessing import Pool
+
+ALLIN_RATE = 0.25       # share of hands that become an all-in confrontation
+SHORT_STACK_PULL = 10   # extra shove weight per (1 / stack in BB)
+MAX_HANDS = 5000        # safety cap per rollout
+
+
+def rollout(stacks, button, small_blind, big_blind, until_level, escalate_every, rng):
+    """Play out one tournament; return player indices from winner to first bust."""
+    chips = list(stacks)
+    seats = [i for i, s in enumerate(chips) if s > 0]
+    busted = [i for i, s in enumerate(chips) if s <= 0]
+    hands = 0
+    while len(seats) > 1 and hands < MAX_HANDS:
+        hands += 1
+        if escalate_every:
+            until_level -= 1
+            if until_level <= 0:
+                small_blind *= 2
+                big_blind *= 2
+                until_level = escalate_every
+
+        n = len(seats)
+        b = bisect_right(seats, button) % n
+        button = seats[b]
+        sb_p = seats[(b + 1) % n] if n > 2 else seats[b]
+        bb_p = seats[(b + 2) % n] if n > 2 else seats[(b + 1) % n]
+        posted = {sb_p: min(small_blind, chips[sb_p])}
+        posted[bb_p] = posted.get(bb_p, 0) + min(big_blind, chips[bb_p] - posted.get(bb_p, 0))
+        for p, amt in posted.items():
+            chips[p] -= amt
+
+        if rng.random() < ALLIN_RATE:
+            weights = [1 + SHORT_STACK_PULL * big_blind / max(chips[p] + posted.get(p, 0), 1)
+                       for p in seats]
+            shover = rng.choices(seats, weights)[0]
+            caller = rng.choice([p for p in seats if p != shover])
+            dead = 0
+            for p, amt in posted.items():
+                if p in (shover, caller):
+                    chips[p] += amt
+                else:
+                    dead += amt
+            stake = min(chips[shover], chips[caller])
+            winner, loser = (shover, caller) if rng.random() < 0.5 else (caller, shover)
+            chips[loser] -= stake
+            chips[winner] += stake + dead
+        else:
+            chips[rng.choice(seats)] += sum(posted.values())
+
+        out = [p for p in seats if chips[p] <= 0]
+        if out:
+            rng.shuffle(out)  # simultaneous busts: random order
+            busted.extend(out)
+            seats = [p for p in seats if chips[p] > 0]
+
+    # Unfinished rollouts (cap reached) rank survivors by chips
+    survivors = sorted(seats, key=lambda p: -chips[p])
+    return survivors + busted[::-1]
+
+
+def _rollout_batch(args):
+    stacks, button, small_blind, big_blind, until_level, escalate_every, deadline, limit, seed = args
+    rng = random.Random(seed)
+    n = len(stacks)
+    counts = [[0] * n for _ in range(n)]
+    done = 0
+    while done < limit and time.time() < deadline:
+        for place, p in enumerate(rollout(stacks, button, small_blind, big_blind,
+                                          until_level, escalate_every, rng)):
+            counts[p][place] += 1
+        done += 1
+    return counts, done
+
+
+class Forecaster:
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count()
+        self.pool = Pool(self.workers) if self.workers > 1 else None
+
+    def forecast(self, stacks, button=0, small_blind=10, big_blind=20, hand_count=0,
+                 escalate_every=10, budget=0.5, max_rollouts=100000):
+        """Place distribution per player within `budget` seconds.
+
+        Returns {"places": [[P(player i finishes place k)]], "win": [...],
+        "rollouts": n}. Places are 0-based (0 = winner).
+        """
+        until_level = escalate_every - hand_count % escalate_every if escalate_every else 0
+        n = len(stacks)
+        counts = [[0] * n for _ in range(n)]
+        total = 0
+
+        deadline = time.time() + budget
+        per_worker = max(1, max_rollouts // self.workers)
+        jobs = [(list(stacks), button, small_blind, big_blind, until_level, escalate_every,
+                 deadline, per_worker, random.getrandbits(32)) for _ in range(self.workers)]
+        results = self.pool.map(_rollout_batch, jobs) if self.pool else map(_rollout_batch, jobs)
+        for batch_counts, done in results:
+            total += done
+            for i in range(n):
+                row = counts[i]
+                for k, c in enumerate(batch_counts[i]):
+                    row[k] += c
+
+        places = [[c / total if total else 0.0 for c in row] for row in counts]
+        return {"places": places, "win": [row[0] for row in places], "rollouts": total}
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast tournament finishes from current stacks")
+    parser.add_argument("stacks", nargs="+", type=int, help="chip stack per seat")
+    parser.add_argument("--button", type=int, default=0, help="seat holding the button last hand")
+    parser.add_argument("--blinds", default="10/20", help="current small/big blind")
+    parser.add_argument("--hand", type=int, default=0, help="hands played so far")
+    parser.add_argument("--escalate-every", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds of rollouts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    small_blind, big_blind = (int(b) for b in args.blinds.split("/"))
+    forecaster = Forecaster(args.workers)
+    try:
+        result = forecaster.forecast(args.stacks, args.button, small_blind, big_blind, args.hand,
+                                     args.escalate_every, budget=args.budget)
+    finally:
+        forecaster.close()
+
+    paid = min(3, len(args.stacks))
+    print(f"\n  {result['rollouts']} rollouts in {args.budget:.1f}s\n")
+    for seat, (stack, places) in enumerate(zip(args.stacks, result["places"])):
+        print(f"  Seat {seat + 1:<3} ${stack:<7} win {places[0]:6.1%}  top {paid} {sum(places[:paid]):6.1%}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Pluggable front ends for the Dealer's event-driven hand flow.
+
+The Dealer runs each hand as a coroutine: it emits events ("state",
+"action", "runout", "showdown", "no_showdown", "elimination"), awaits a decision for
+every player to act, and awaits wait() between streets. A front end decides
+how those are rendered and where decisions come from:
+
+    TerminalFrontend  -- the interactive terminal game (display.py + input())
+    BotFrontend       -- headless; every player decides via choose_action
+    ScriptedFrontend  -- replays scripted actions and records events (tests)
+
+Front ends that never block on real I/O can be driven without an event loop
+through run_sync(). TerminalFrontend awaits real I/O (the AI delay, and the
+player's input on a worker thread), so it sets needs_loop and drive() runs
+it under asyncio.run() instead; Dealer.play_hand() goes through drive().
+Front ends that yield to the loop (BotFrontend does) let one process host
+many concurrent games with play_concurrently(), including a terminal table
+whose prompts wait on a thread while the others keep playing.
+"""
+
+import asyncio
+import threading
+
+from display import (
+    render_game_state, render_action, render_runout, render_showdown,
+    render_winner_no_showdown, render_elimination, wait_for_enter,
+)
+from player import HumanPlayer
+
+AI_DELAY = 0.3  # seconds to pause after each AI action in the terminal
+
+
+def run_sync(coro):
+    """Drive a coroutine to completion without an event loop.
+
+    Bare yields (asyncio.sleep(0)) are resumed immediately; awaiting a real
+    future means the front end needs an event loop, which is an error here.
+    """
+    while True:
+        try:
+            yielded = coro.send(None)
+        except StopIteration as e:
+            return e.value
+        if yielded is not None:
+            coro.close()
+            raise RuntimeError("front end awaited real I/O; use the *_async methods inside an event loop")
+
+
+async def blocking_call(fn, *args):
+    """Await a blocking (input) call on a daemon thread.
+
+    Not asyncio.to_thread(): executor threads are joined at shutdown, so
+    Ctrl-C during a prompt would hang until Enter was pressed.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(setter, value):
+        if not future.done():
+            setter(value)
+
+    def run():
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            outcome = (future.set_exception, e)
+        else:
+            outcome = (future.set_result, result)
+        try:
+            loop.call_soon_threadsafe(settle, *outcome)
+        except RuntimeError:  # loop already closed
+            pass
+
+    threading.Thread(target=run, daemon=True).start()
+    return await future
+
+
+def drive(frontend, coro):
+    """Run a Dealer coroutine from synchronous code with what the front end needs."""
+    if frontend.needs_loop:
+        return asyncio.run(coro)
+    return run_sync(coro)
+
+
+async def play_concurrently(dealers):
+    """Play one hand at each dealer's table concurrently on the running loop."""
+    return await asyncio.gather(*(d.play_hand_async() for d in dealers))
+
+
+class Frontend:
+    """Base front end: ignores events and asks each player's choose_action."""
+
+    wants_runout_ladder = False  # compute per-street equities for all-in runouts
+    wants_potential = False      # compute the human's hand potential (EHS, PPot, NPot)
+    needs_loop = False           # awaits real I/O, so run_sync() cannot drive it
+
+    async def event(self, dealer, name, **data):
+        pass
+
+    async def decide(self, dealer, player, **spot):
+        return player.choose_action(**spot)
+
+    async def wait(self, dealer, message):
+        pass
+
+
+class TerminalFrontend(Frontend):
+    """Interactive terminal: blocking input() runs on a worker thread so the
+    event loop (and any other tables on it) keeps going while the player thinks."""
+
+    wants_runout_ladder = True
+    wants_potential = True
+    needs_loop = True
+
+    def __init__(self, ai_delay=AI_DELAY):
+        self.ai_delay = ai_delay
+
+    async def event(self, dealer, name, **data):
+        if name == "state":
+            human = dealer._get_human()
+            if human:
+                # Frames before AI actions may be skipped when they arrive quickly
+                actor = data.get("actor")
+                render_game_state(human, dealer.table, dealer.players, data["equity"],
+                                  data["recommendation"], data["to_call"], data["min_bet"],
+                                  force=actor is None or actor is human,
+                                  icm_required=data.get("icm_required"),
+                                  potential=data.get("potential"))
+        elif name == "action":
+            player = data["player"]
+            render_action(player.name, data["action"], data["amount"])
+            if player is not dealer._get_human() and self.ai_delay:
+                await asyncio.sleep(self.ai_delay)
+        elif name == "runout":
+            render_runout(data["players"], data["ladder"])
+        elif name == "showdown":
+            render_showdown(data["awards"], data["hands"], data["board"], data["pot"])
+        elif name == "no_showdown":
+            render_winner_no_showdown(data["winner"], data["pot"])
+        elif name == "elimination":
+            render_elimination(data["player"])
+
+    async def decide(self, dealer, player, **spot):
+        if isinstance(player, HumanPlayer):
+            return await blocking_call(lambda: player.choose_action(**spot))
+        return player.choose_action(**spot)
+
+    async def wait(self, dealer, message):
+        await blocking_call(wait_for_enter, message)
+
+
+class BotFrontend(Frontend):
+    """Headless driver for AI-only games; yields to the loop before each decision."""
+
+    async def decide(self, dealer, player, **spot):
+        await asyncio.sleep(0)
+        return player.choose_action(**spot)
+
+
+class ScriptedFrontend(Frontend):
+    """Plays scripted (action, amount) pairs per player name and records every event.
+
+    Players without remaining scripted actions fall back to choose_action.
+    """
+
+    def __init__(self, script=None):
+        self.script = {name: list(actions) for name, actions in (script or {}).items()}
+        self.log = []
+
+    async def event(self, dealer, name, **data):
+        self.log.append((name, data))
+
+    async def decide(self, dealer, player, **spot):
+        actions = self.script.get(player.name)
+        if actions:
+            return actions.pop(0)
+        return player.choose_action(**spot)
+
+    async def wait(self, dealer, message):
+        self.log.append(("wait", {"message": message}))
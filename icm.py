@@ -0,0 +1,163 @@
+"""Independent Chip Model: tournament equity in prize-pool terms.
+
+Malmuth-Harville finishing probabilities computed by dynamic programming
+over bitmask subsets of the players already placed, layer by layer, so only
+the subsets that can still be paid are visited (sum of C(n, k) for k below
+the number of paid places) instead of the factorial recursion. Results are
+memoized by stacks and payouts. Fields too large for the exact layers fall
+back to Monte Carlo over Plackett-Luce finishing orders: one seeded ICM
+model per field size and payout table is kept and updated incrementally as
+stacks change, so repeated queries (fold / win / lose in
+icm_required_equity) share their random draws and differ only by the
+stacks that actually moved.
+"""
+
+import heapq
+import random
+from functools import lru_cache
+
+DEFAULT_PAYOUTS = (0.5, 0.3, 0.2)
+EXACT_STATE_LIMIT = 200000  # max subset states before falling back to Monte Carlo
+MC_TRIALS = 2000
+MC_SEED = 0
+
+_MC_MODELS = {}  # (players, payouts, trials) -> ICM reused through update()
+
+
+def default_payouts(entrants):
+    """Top ~15% paid (at least 3), geometric 1.5x steps, normalized to 1."""
+    if entrants <= 9:
+        return DEFAULT_PAYOUTS
+    paid = max(3, entrants * 15 // 100)
+    weights = [1.5 ** (paid - i) for i in range(paid)]
+    total = sum(weights)
+    return tuple(w / total for w in weights)
+
+
+def _num_states(n, places):
+    count = 0
+    layer = 1
+    for k in range(places):
+        count += layer
+        layer = layer * (n - k) // (k + 1)
+    return count
+
+
+@lru_cache(maxsize=4096)
+def _icm_exact(stacks, payouts):
+    n = len(stacks)
+    total = sum(stacks)
+    equities = [0.0] * n
+    # layer maps bitmask of placed players -> (probability, chips placed)
+    layer = {0: (1.0, 0)}
+    for place in range(min(len(payouts), n)):
+        prize = payouts[place]
+        next_layer = {}
+        for mask, (prob, placed) in layer.items():
+            left = total - placed
+            if left <= 0:
+                continue
+            for i in range(n):
+                bit = 1 << i
+                if mask & bit or stacks[i] == 0:
+                    continue
+                p = prob * stacks[i] / left
+                equities[i] += p * prize
+                if place + 1 < len(payouts):
+                    key = mask | bit
+                    prev = next_layer.get(key)
+                    next_layer[key] = (p + prev[0] if prev else p, placed + stacks[i])
+        layer = next_layer
+    return tuple(equities)
+
+
+def icm_equities(stacks, payouts=DEFAULT_PAYOUTS, trials=MC_TRIALS):
+    """Each player's share of the prize pool (payouts are pool fractions)."""
+    stacks = tuple(int(s) for s in stacks)
+    payouts = tuple(payouts)
+    if _num_states(len(stacks), len(payouts)) <= EXACT_STATE_LIMIT:
+        return list(_icm_exact(stacks, payouts))
+    return _icm_monte_carlo(stacks, payouts, trials)
+
+
+def _icm_monte_carlo(stacks, payouts, trials):
+    key = (len(stacks), payouts, trials)
+    model = _MC_MODELS.get(key)
+    if model is None:
+        model = _MC_MODELS[key] = ICM(stacks, payouts, trials, seed=MC_SEED)
+    else:
+        for i, chips in enumerate(stacks):
+            if model.stacks[i] != chips:
+                model.update(i, chips)
+    return model.equities()
+
+
+def icm_required_equity(stacks, hero, villain, pot, to_call, payouts=DEFAULT_PAYOUTS):
+    """Equity hero needs to call to_call into pot against villain under ICM.
+
+    Compares prize equity after folding (villain takes the pot), winning and
+    losing the call. Falls back to chip pot odds when the call cannot change
+    hero's prize equity.
+    """
+    call = min(to_call, stacks[hero])
+    fold = list(stacks)
+    fold[villain] += pot
+    win = list(stacks)
+    win[hero] += pot
+    lose = list(stacks)
+    lose[hero] -= call
+    lose[villain] += pot + call
+    e_fold = icm_equities(fold, payouts)[hero]
+    e_win = icm_equities(win, payouts)[hero]
+    e_lose = icm_equities(lose, payouts)[hero]
+    if e_win <= e_lose:
+        return call / (pot + call) if pot + call > 0 else 0.5
+    return max(0.0, min(1.0, (e_fold - e_lose) / (e_win - e_lose)))
+
+
+class ICM:
+    """Monte Carlo ICM with common random numbers for incremental updates.
+
+    Each trial draws one Exp(1) variate per player; sorting variate/stack
+    gives a Plackett-Luce (Malmuth-Harville) finishing order. The draws are
+    kept, so update() only re-ranks the trials whose paid places the changed
+    player enters or leaves.
+    """
+
+    def __init__(self, stacks, payouts=DEFAULT_PAYOUTS, trials=MC_TRIALS, seed=None):
+        rng = random.Random(seed)
+        self.stacks = list(stacks)
+        self.payouts = tuple(payouts)
+        self.places = min(len(self.payouts), len(self.stacks))
+        self.draws = [[rng.expovariate(1.0) for _ in self.stacks] for _ in range(trials)]
+        self.top = [self._rank(t) for t in range(trials)]
+        self._totals = [0.0] * len(self.stacks)
+        for top in self.top:
+            self._credit(top, 1)
+
+    def _key(self, trial, i):
+        s = self.stacks[i]
+        return self.draws[trial][i] / s if s > 0 else float("inf")
+
+    def _rank(self, trial):
+        alive = [i for i, s in enumerate(self.stacks) if s > 0]
+        return heapq.nsmallest(self.places, alive, key=lambda i: self._key(trial, i))
+
+    def _credit(self, top, sign):
+        for place, i in enumerate(top):
+            self._totals[i] += sign * self.payouts[place]
+
+    def equities(self):
+        trials = len(self.draws)
+        return [t / trials for t in self._totals]
+
+    def update(self, i, chips):
+        """Change one stack and refresh only the affected trials."""
+        self.stacks[i] = chips
+        for t, top in enumerate(self.top):
+            full = len(top) == self.places
+            cutoff = self._key(t, top[-1]) if full else float("inf")
+            if i in top or self._key(t, i) < cutoff:
+                self._credit(top, -1)
+                self.top[t] = self._rank(t)
+                self._credit(self.top[t], 1)
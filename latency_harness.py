@@ -0,0 +1,165 @@
+"""End-to-end prompt latency harness for the terminal game.
+
+Runs main.py under a pseudo-terminal with a fixed seed, answers every
+prompt from a script, and measures what the player feels: the time from
+sending a line (pressing Enter) until the game shows its next prompt. That
+covers rendering, equity computation and every AI turn in between. The
+game's pause after AI actions is skipped (--no-delay) unless --ai-delay
+asks for it, so by default the numbers are compute time only. Latencies are collected across whole games and reported as
+percentiles per prompt kind:
+
+    enter   -- wait_for_enter ("Press Enter ...")
+    action  -- HumanPlayer.choose_action ("[c]all ..., [a]ll-in: ")
+
+Example:
+
+    python latency_harness.py --games 5 --seed 1 --script x,x,c
+"""
+
+import argparse
+import fcntl
+import os
+import pty
+import re
+import select
+import signal
+import struct
+import sys
+import termios
+import time
+
+from equity_server import percentile
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+PROMPT_TIMEOUT = 120.0  # seconds before a prompt counts as a hang
+ROWS, COLS = 50, 120
+
+_ANSI = re.compile(rb"\x1b\[[0-9;?]*[A-Za-z]")
+_PROMPTS = [
+    ("enter", re.compile(rb"Press Enter[^\n]*\.\.\.$")),
+    ("action", re.compile(rb"\[a\]ll-in: $")),
+    ("amount", re.compile(rb"Amount: $")),
+    ("buyback", re.compile(rb"\[y/n\]: $")),
+]
+
+
+def _spawn(args):
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.execv(sys.executable, [sys.executable, MAIN] + args)
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", ROWS, COLS, 0, 0))
+    return pid, fd
+
+
+def _prompt_kind(output):
+    # Prompts have no trailing newline; anything after one means output continues
+    last = _ANSI.sub(b"", output[-400:]).rsplit(b"\n", 1)[-1]
+    for kind, pattern in _PROMPTS:
+        if pattern.search(last):
+            return kind
+    return None
+
+
+def _read_until_prompt(fd, timeout):
+    """Read game output until a prompt appears; (kind, output), kind None at exit."""
+    output = b""
+    deadline = time.perf_counter() + timeout
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError(f"no prompt within {timeout:.0f}s; last output: {output[-200:]!r}")
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            continue
+        try:
+            chunk = os.read(fd, 65536)
+        except OSError:  # EIO: the game exited and closed the terminal
+            return None, output
+        if not chunk:
+            return None, output
+        output += chunk
+        kind = _prompt_kind(output)
+        if kind is not None:
+            return kind, output
+
+
+def play_game(seed, script, extra_args=(), timeout=PROMPT_TIMEOUT, max_prompts=None,
+              ai_delay=False):
+    """Play one game; return [(prompt kind, seconds from previous answer)].
+
+    ai_delay keeps the game's pause after each AI action.
+    """
+    args = ["--seed", str(seed)] + ([] if ai_delay else ["--no-delay"])
+    pid, fd = _spawn(args + list(extra_args))
+    samples = []
+    answers = {"enter": "", "amount": "", "buyback": "n"}
+    step = 0
+    try:
+        kind, _ = _read_until_prompt(fd, timeout)  # startup is not a keypress
+        while kind is not None and (max_prompts is None or len(samples) < max_prompts):
+            if kind == "action":
+                answer = script[step % len(script)]
+                step += 1
+            else:
+                answer = answers[kind]
+            os.write(fd, answer.encode() + b"\r")
+            start = time.perf_counter()
+            kind, _ = _read_until_prompt(fd, timeout)
+            if kind is not None:
+                samples.append((kind, time.perf_counter() - start))
+    finally:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        os.waitpid(pid, 0)
+        os.close(fd)
+    return samples
+
+
+def _report(label, values):
+    if not values:
+        return
+    values = sorted(values)
+    print(f"  {label:8s} n={len(values):<6} p50 {percentile(values, 50) * 1000:8.1f} ms  "
+          f"p90 {percentile(values, 90) * 1000:8.1f} ms  p99 {percentile(values, 99) * 1000:8.1f} ms  "
+          f"max {values[-1] * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure prompt-to-prompt latency of main.py under a PTY")
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0, help="first game's seed; game i uses seed + i")
+    parser.add_argument("--script", default="x",
+                        help="comma-separated answers to action prompts, cycled (x = follow the suggestion)")
+    parser.add_argument("--max-prompts", type=int, default=None, help="stop each game after this many prompts")
+    parser.add_argument("--timeout", type=float, default=PROMPT_TIMEOUT)
+    parser.add_argument("--ai-delay", action="store_true",
+                        help="keep the pause after AI actions (latency as played, not just compute)")
+    parser.add_argument("--equity-store", action="store_true",
+                        help="let the game use its persistent equity store (runs then depend on its contents)")
+    parser.add_argument("game_args", nargs=argparse.REMAINDER,
+                        help="extra main.py arguments after --, e.g. -- --cheat")
+    args = parser.parse_args()
+
+    script = args.script.split(",")
+    extra = [a for a in args.game_args if a != "--"]
+    if args.equity_store:
+        extra.append("--equity-store")
+    samples = []
+    for i in range(args.games):
+        start = time.time()
+        game = play_game(args.seed + i, script, extra, args.timeout, args.max_prompts,
+                         args.ai_delay)
+        samples.extend(game)
+        print(f"  game {i + 1} (seed {args.seed + i}): {len(game)} prompts in {time.time() - start:.1f}s")
+
+    print()
+    _report("all", [s for _, s in samples])
+    for kind, _ in _PROMPTS:
+        _report(kind, [s for k, s in samples if k == kind])
+    print()
+
+
+if __name__ == "__main__":
+    main()
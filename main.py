@@ -1,8 +1,17 @@
 import argparse
+import asyncio
+import atexit
+import random
+import equity
+from equity_store import EquityStore, default_path
 from player import HumanPlayer, AIPlayer
 from table import Table
 from dealer import Dealer
-from display import render_chip_counts, clear_screen, wait_for_enter
+from frontend import AI_DELAY, TerminalFrontend, blocking_call
+from tournament import Tournament
+from forecast import Forecaster
+from rollout import RolloutAdvisor
+from display import render_chip_counts, render_forecast, clear_screen, wait_for_enter
 import display
 
 SMALL_BLIND = 10
@@ -13,9 +22,30 @@ START_STACK = 1000
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--cheat", action="store_true", help="Show opponent hands and equities")
+    parser.add_argument("--entrants", type=int, default=9, help="Field size; more than 9 plays a multi-table tournament")
+    parser.add_argument("--no-human", action="store_true", help="AI-only multi-table simulation")
+    parser.add_argument("--advisor", action="store_true", help="Recommend actions from rollout EVs")
+    parser.add_argument("--seed", type=int, default=None, help="Seed cards and AI decisions for a reproducible game")
+    parser.add_argument("--no-delay", action="store_true", help="Skip the pause after AI actions")
+    parser.add_argument("--equity-store", action="store_true",
+                        help=f"Keep flop/turn equities in {default_path()} and reuse them across sessions")
+    parser.add_argument("--forecast", action="store_true", help="Show finish forecasts with chip counts")
     args = parser.parse_args()
 
     display.CHEAT_MODE = args.cheat
+    if args.equity_store:
+        store = EquityStore(default_path())
+        equity.set_equity_store(store)
+        atexit.register(store.close)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if args.entrants > 9 or args.no_human:
+        print(f"\n  Multi-table tournament: {args.entrants} entrants | ${START_STACK} starting stacks | "
+              f"${SMALL_BLIND}/${BIG_BLIND} blinds\n")
+        Tournament(args.entrants, START_STACK, SMALL_BLIND, BIG_BLIND, ESCALATE_EVERY,
+                   human=not args.no_human).run()
+        return
 
     print("\n  Welcome to Texas Hold'em Tournament Simulator!")
     print(f"  9 players | ${START_STACK} starting stacks | ${SMALL_BLIND}/${BIG_BLIND} blinds\n")
@@ -27,8 +57,20 @@ def main():
         players.append(AIPlayer(f"Player {i}", START_STACK))
 
     table = Table(small_blind=SMALL_BLIND, big_blind=BIG_BLIND, escalate_every=ESCALATE_EVERY)
-    dealer = Dealer(table, players)
+    dealer = Dealer(table, players, TerminalFrontend(0 if args.no_delay else AI_DELAY))
+    if args.advisor:
+        dealer.advisor = RolloutAdvisor()
+    forecaster = Forecaster() if args.forecast else None
+
+    try:
+        asyncio.run(play_game(dealer, players, forecaster))
+    finally:
+        if forecaster:
+            forecaster.close()
+
 
+async def play_game(dealer, players, forecaster=None):
+    """Play hands at the single table until someone has won or the human is out."""
     while True:
         active = [p for p in players if p.is_active]
         if len(active) < 2:
@@ -37,7 +79,7 @@ def main():
         human = players[0]
         if not human.is_active:
             if display.CHEAT_MODE:
-                choice = input("\n  You have been eliminated. Buy back in? [y/n]: ").strip().lower()
+                choice = (await blocking_call(input, "\n  You have been eliminated. Buy back in? [y/n]: ")).strip().lower()
                 if choice == "y":
                     human.chips = START_STACK
                     human.is_active = True
@@ -49,10 +91,10 @@ def main():
                 print("\n  You have been eliminated. Game over!\n")
                 break
 
-        if not dealer.play_hand():
+        if not await dealer.play_hand_async():
             break
 
-        dealer.eliminate_players()
+        await dealer.eliminate_players_async()
 
         active = [p for p in players if p.is_active]
         if len(active) == 1:
@@ -63,8 +105,13 @@ def main():
                 print(f"\n  {winner.name} wins the tournament!\n")
             break
 
-        render_chip_counts(players)
-        wait_for_enter()
+        render_chip_counts(players, dealer.payouts)
+        if forecaster:
+            render_forecast(players, forecaster.forecast(
+                [p.chips if p.is_active else 0 for p in players], dealer.table.dealer_pos,
+                dealer.table.small_blind, dealer.table.big_blind, dealer.table.hand_count,
+                dealer.table.escalate_every))
+        await blocking_call(wait_for_enter)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,16 @@ import random
 SELF_PRESERVE_BB = 5
 # Probability that self-preservation kicks in when triggered
 SELF_PRESERVE_CHANCE = 0.50
+# Semi-bluff a free street with draws whose positive potential is at least this
+SEMI_BLUFF_PPOT = 0.25
+# Read opponents' betting once they have this much (decayed) history
+STATS_MIN_HANDS = 20
+# Facing a bet, count equity this much higher against aggressive opponents
+# (aggression factor at least STATS_AGGRESSIVE_AF) and lower against passive
+# ones (below STATS_PASSIVE_AF), whose bets mean more
+STATS_CALL_ADJUST = 0.04
+STATS_AGGRESSIVE_AF = 2.5
+STATS_PASSIVE_AF = 1.0
 
 
 class Player:
@@ -124,11 +134,24 @@ def _compute_action(equity, to_call, pot, chips, min_raise, max_raise, num_commu
             return ("raise", raise_to)
 
 
-def recommend_action(equity, to_call, pot, chips, min_raise, max_raise, num_community=5, current_bet=0, players_in_hand=9):
-    """Return a short recommendation string based on equity and pot odds."""
+def recommend_action(equity, to_call, pot, chips, min_raise, max_raise, num_community=5, current_bet=0, players_in_hand=9, action_evs=None):
+    """Return a short recommendation string based on equity and pot odds.
+
+    With action_evs ({(action, amount): (ev, rollouts)} from a
+    rollout.RolloutAdvisor) the highest-EV action is recommended instead.
+    """
+    if action_evs:
+        (action, amount), (ev, _) = max(action_evs.items(), key=lambda kv: kv[1][0])
+        if action == "call" and amount >= chips:
+            action = "all-in"
+        return f"{_describe(action, amount, to_call, current_bet)} (EV {ev:+.0f})"
     if equity is None:
         return None
     action, amount = _compute_action(equity, to_call, pot, chips, min_raise, max_raise, num_community, players_in_hand, is_user=True)
+    return _describe(action, amount, to_call, current_bet)
+
+
+def _describe(action, amount, to_call, current_bet):
     if action == "fold":
         return "Fold"
     if action == "check":
@@ -144,7 +167,7 @@ def recommend_action(equity, to_call, pot, chips, min_raise, max_raise, num_comm
 
 
 class HumanPlayer(Player):
-    def choose_action(self, to_call, min_raise, max_raise, pot, current_bet=0, equity=None, num_community=5, players_in_hand=2, big_blind=10):
+    def choose_action(self, to_call, min_raise, max_raise, pot, current_bet=0, equity=None, num_community=5, players_in_hand=2, big_blind=10, icm_equity=None, potential=None, opponent_stats=None):
         while True:
             if to_call == 0 and current_bet > 0:
                 # BB option: can check or raise, no fold
@@ -195,13 +218,33 @@ class HumanPlayer(Player):
                 print("Invalid action.")
 
 
+def _stats_adjustment(opponent_stats):
+    """Equity shift from the mean aggression of opponents with enough history."""
+    known = [v["af"] for v in (opponent_stats or {}).values()
+             if v is not None and v["hands"] >= STATS_MIN_HANDS]
+    if not known:
+        return 0.0
+    af = sum(known) / len(known)
+    if af >= STATS_AGGRESSIVE_AF:
+        return STATS_CALL_ADJUST
+    if af < STATS_PASSIVE_AF:
+        return -STATS_CALL_ADJUST
+    return 0.0
+
+
 class AIPlayer(Player):
-    def choose_action(self, to_call, min_raise, max_raise, pot, current_bet=0, equity=None, num_community=5, players_in_hand=2, big_blind=10):
+    def choose_action(self, to_call, min_raise, max_raise, pot, current_bet=0, equity=None, num_community=5, players_in_hand=2, big_blind=10, icm_equity=None, potential=None, opponent_stats=None):
         if equity is None:
             equity = 0.5
         # Add noise so AI isn't perfectly predictable
         noise = random.uniform(-0.07, 0.07)
         eq = max(0.0, min(1.0, equity + noise))
+        if to_call > 0:
+            eq = max(0.0, min(1.0, eq + _stats_adjustment(opponent_stats)))
+        # ICM risk premium: calling needs more equity than chip pot odds imply
+        if to_call > 0 and icm_equity is not None:
+            pot_odds = to_call / (pot + to_call)
+            eq = max(0.0, eq - max(0.0, icm_equity - pot_odds))
 
         # Rare overbet/shove when facing a bet with very high equity
         if to_call > 0 and eq > 0.85:
@@ -218,6 +261,13 @@ class AIPlayer(Player):
 
         action, amount = _compute_action(eq, to_call, pot, self.chips, min_raise, max_raise, num_community, players_in_hand)
 
+        # Semi-bluff: bet a strong draw when checked to, some of the time
+        if (action == "check" and potential is not None and num_community in (3, 4)
+                and min_raise <= max_raise and potential["ppot"] >= SEMI_BLUFF_PPOT
+                and random.random() < potential["ppot"]):
+            target = min(max(min_raise, int(pot * 0.5)), max_raise)
+            action, amount = ("all-in", self.chips) if target >= self.chips else ("raise", target)
+
         # Self-preservation: avoid risking elimination when many opponents remain
         if players_in_hand > 2 and random.random() < SELF_PRESERVE_CHANCE:
             preserve_floor = SELF_PRESERVE_BB * big_blind
@@ -0,0 +1,165 @@
+"""Generate flop_atlas.bin: flop equity and hand potential for every canonical spot.
+
+Every (hole, flop) pair is reduced to its suit-isomorphic form (about 1.29M
+distinct spots across the 169 hand categories). For each spot we store
+equity against 1-8 opponents plus heads-up positive/negative potential, as
+uint16 fixed point, next to a sorted key array that equity.py memory-maps
+and binary-searches.
+
+Each simulation deals one turn/river and eight opponent hands, so a single
+draw scores all eight opponent counts at once (the first k hands are the
+k-opponent lineup). Heads-up equity and potential use every one of the eight
+hands as a separate heads-up opponent, which cuts their variance per draw;
+with NUM_SIMULATIONS draws the heads-up standard error is well under the
+live flop sampler's (about 0.014 at BOARD_SAMPLES runouts).
+
+Build cost: about 0.33 s per spot at the default 2000 simulations, so
+roughly 120 CPU-hours for the full atlas (under 8 hours on 16 cores). Use
+--categories and a lower --sims for trial runs; halving --sims halves the
+time but leaves the heads-up column noisier than the live sampler.
+"""
+
+import argparse
+import os
+import random
+import time
+from array import array
+from itertools import combinations
+from multiprocessing import Pool
+
+from treys import Deck, Evaluator
+
+from equity import (
+    FLOP_ATLAS_FIELDS, FLOP_ATLAS_HEADER, FLOP_ATLAS_MAGIC, FLOP_ATLAS_OPPONENTS,
+    flop_atlas_key,
+)
+from precompute_equity import hand_categories, representative_cards
+
+evaluator = Evaluator()
+NUM_SIMULATIONS = 2000  # per canonical spot, shared across all opponent counts
+OUTPUT_FILE = "flop_atlas.bin"
+
+
+def canonical_flops(hole):
+    """Map each canonical flop key for this hole to one concrete flop."""
+    remaining = [c for c in Deck.GetFullDeck() if c not in hole]
+    flops = {}
+    for flop in combinations(remaining, 3):
+        key = flop_atlas_key(hole, flop)
+        if key not in flops:
+            flops[key] = list(flop)
+    return flops
+
+
+def simulate_spot(hole, flop, num_sims=NUM_SIMULATIONS, rng=random):
+    """Return equity vs 1..8 opponents and heads-up (ppot, npot) for one flop."""
+    remaining = [c for c in Deck.GetFullDeck() if c not in hole and c not in flop]
+    cards_needed = 2 + 2 * FLOP_ATLAS_OPPONENTS
+    shares = [0.0] * FLOP_ATLAS_OPPONENTS
+    # Potential counts indexed [now][final] with 0=ahead, 1=tied, 2=behind
+    hp = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+
+    hero_now = evaluator.evaluate(flop, hole)
+    now_by_combo = {}  # opponent combo -> 0/1/2 (hero ahead/tied/behind) on the flop
+    for _ in range(num_sims):
+        drawn = rng.sample(remaining, cards_needed)
+        board = flop + drawn[:2]
+        hero = evaluator.evaluate(board, hole)
+
+        best_opp = None
+        best_count = 0  # opponents holding best_opp
+        for o in range(FLOP_ATLAS_OPPONENTS):
+            opp = drawn[2 + o * 2: 4 + o * 2]
+            score = evaluator.evaluate(board, opp)
+            # Every drawn hand is also a heads-up opponent on its own
+            combo = (opp[0], opp[1]) if opp[0] < opp[1] else (opp[1], opp[0])
+            now = now_by_combo.get(combo)
+            if now is None:
+                opp_now = evaluator.evaluate(flop, opp)
+                now = now_by_combo[combo] = 0 if hero_now < opp_now else 1 if hero_now == opp_now else 2
+            final = 0 if hero < score else 1 if hero == score else 2
+            hp[now][final] += 1
+            if best_opp is None or score < best_opp:
+                best_opp, best_count = score, 1
+            elif score == best_opp:
+                best_count += 1
+            if hero < best_opp:
+                shares[o] += 1
+            elif hero == best_opp:
+                # The pot splits evenly among everyone holding the best hand
+                shares[o] += 1 / (best_count + 1)
+
+    behind = sum(hp[2]) + sum(hp[1]) / 2
+    ahead = sum(hp[0]) + sum(hp[1]) / 2
+    ppot = (hp[2][0] + hp[2][1] / 2 + hp[1][0] / 2) / behind if behind else 0.0
+    npot = (hp[0][2] + hp[0][1] / 2 + hp[1][2] / 2) / ahead if ahead else 0.0
+    # Heads-up equity from the final columns, over all eight heads-up opponents
+    shares[0] = sum(row[0] + row[1] / 2 for row in hp) * num_sims / sum(map(sum, hp))
+    return [s / num_sims for s in shares] + [ppot, npot]
+
+
+def spot_rng(seed, key):
+    """Per-spot generator, so a seeded build is reproducible spot by spot."""
+    return random if seed is None else random.Random((seed << 30) | key)
+
+
+def build_category(args):
+    """Worker: every canonical flop for one hand category -> (keys, packed rows)."""
+    hand_key, num_sims, seed = args
+    hole = representative_cards(hand_key)
+    keys = array("I")
+    rows = array("H")
+    for key, flop in sorted(canonical_flops(hole).items()):
+        keys.append(key)
+        values = simulate_spot(hole, flop, num_sims, spot_rng(seed, key))
+        rows.extend(int(round(v * 65535)) for v in values)
+    return hand_key, keys, rows
+
+
+def write_atlas(path, keys, rows):
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    sorted_keys = array("I", (keys[i] for i in order))
+    sorted_rows = array("H")
+    for i in order:
+        sorted_rows.extend(rows[i * FLOP_ATLAS_FIELDS:(i + 1) * FLOP_ATLAS_FIELDS])
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(FLOP_ATLAS_HEADER.pack(FLOP_ATLAS_MAGIC, len(sorted_keys),
+                                       FLOP_ATLAS_OPPONENTS, FLOP_ATLAS_FIELDS))
+        sorted_keys.tofile(f)
+        sorted_rows.tofile(f)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the flop equity atlas")
+    parser.add_argument("--sims", type=int, default=NUM_SIMULATIONS,
+                        help="simulations per spot (the default takes ~120 CPU-hours in total)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--categories", type=int, default=None,
+                        help="only build the first N hand categories (for trial runs)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible build")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    categories = list(hand_categories())[:args.categories]
+    print(f"Computing flop atlas for {len(categories)} hand categories "
+          f"({args.sims} sims per spot, {args.workers} workers)...")
+
+    keys = array("I")
+    rows = array("H")
+    start = time.time()
+    with Pool(args.workers) as pool:
+        jobs = [(key, args.sims, args.seed) for key in categories]
+        for done, (hand_key, k, r) in enumerate(pool.imap_unordered(build_category, jobs), 1):
+            keys.extend(k)
+            rows.extend(r)
+            print(f"  {done}/{len(categories)}  {hand_key}: {len(k)} flops  "
+                  f"({time.time() - start:.0f}s elapsed)")
+
+    write_atlas(args.output, keys, rows)
+    print(f"\nWrote {args.output} ({len(keys)} spots x {FLOP_ATLAS_FIELDS} fields)")
+
+
+if __name__ == "__main__":
+    main()
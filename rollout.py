@@ -0,0 +1,289 @@
+"""Compact hand state with cheap snapshot/restore, and a rollout advisor.
+
+HandState holds one hand in flat lists and bitmasks (no Player or Table
+objects), so forking it is a handful of list copies. RolloutAdvisor plays
+the rest of the hand from a decision point many times per candidate action,
+with opponents' cards sampled from the cards the actor cannot see and
+every seat following the AI decision tree on a cheap strength estimate, and
+returns each candidate's chip EV.
+
+Every candidate is played against the same sampled deals (common random
+numbers), so EV differences are much less noisy than the EVs themselves.
+"""
+
+import random
+import time
+
+from treys import Evaluator
+
+from equity import _PREFLOP_EQUITY, _hand_key
+from player import AIPlayer, _compute_action
+
+_evaluator = Evaluator()
+
+ROLLOUT_BUDGET = 0.25   # seconds per decision
+MAX_ROLLOUTS = 400      # per candidate action
+STRENGTH_NOISE = 0.07   # same noise AIPlayer adds to its equity
+
+
+class HandState:
+    __slots__ = ("hole", "board", "deck", "chips", "bets", "contrib", "live", "pending",
+                 "actor", "current_bet", "min_raise", "button", "big_blind")
+
+    def __init__(self, hole, board, deck, chips, bets, contrib, live, pending, actor,
+                 current_bet, min_raise, button, big_blind):
+        self.hole = hole            # per seat: (card, card) or None
+        self.board = board
+        self.deck = deck            # undealt cards; dealing pops from the end
+        self.chips = chips          # behind, per seat
+        self.bets = bets            # this street, per seat
+        self.contrib = contrib      # whole hand, per seat
+        self.live = live            # bitmask of seats still in the hand
+        self.pending = pending      # bitmask of seats still to act this street
+        self.actor = actor          # seat to act, -1 once the hand is over
+        self.current_bet = current_bet
+        self.min_raise = min_raise  # minimum raise increment
+        self.button = button
+        self.big_blind = big_blind
+
+    @classmethod
+    def from_dealer(cls, dealer, actor, current_bet, min_raise, acted=()):
+        """State at a live Dealer decision point, seen by `actor` (a Player).
+
+        Cards the actor cannot see (the deck and everyone else's hole cards)
+        are pooled into `deck`; deal_unknown() redistributes them.
+        """
+        players = dealer.players
+        contributions = dealer.table.contributions
+        hidden = list(dealer.deck.cards)
+        hole, live, pending = [], 0, 0
+        for seat, p in enumerate(players):
+            if p is actor:
+                hole.append(tuple(p.hole_cards))
+            else:
+                hole.append(None)
+                hidden.extend(p.hole_cards)
+            if p.is_in_hand:
+                live |= 1 << seat
+                if not p.is_all_in and (p not in acted or p.current_bet < current_bet):
+                    pending |= 1 << seat
+        return cls(hole, list(dealer.table.community_cards), hidden,
+                   [p.chips for p in players], [p.current_bet for p in players],
+                   [contributions.get(p.name, 0) for p in players], live, pending,
+                   players.index(actor), current_bet, min_raise, dealer.table.dealer_pos,
+                   dealer.table.big_blind)
+
+    def snapshot(self):
+        return (self.hole[:], self.board[:], self.deck[:], self.chips[:], self.bets[:],
+                self.contrib[:], self.live, self.pending, self.actor, self.current_bet,
+                self.min_raise, self.button, self.big_blind)
+
+    def restore(self, snap):
+        (hole, board, deck, chips, bets, contrib, self.live, self.pending, self.actor,
+         self.current_bet, self.min_raise, self.button, self.big_blind) = snap
+        self.hole, self.board, self.deck = hole[:], board[:], deck[:]
+        self.chips, self.bets, self.contrib = chips[:], bets[:], contrib[:]
+
+    def copy(self):
+        return HandState(*self.snapshot())
+
+    def seats(self, mask):
+        return [s for s in range(len(self.chips)) if mask >> s & 1]
+
+    def to_call(self, seat=None):
+        seat = self.actor if seat is None else seat
+        return min(self.current_bet - self.bets[seat], self.chips[seat])
+
+    def pot(self):
+        return sum(self.contrib)
+
+    def deal_unknown(self, rng):
+        """Shuffle the hidden cards and give every live seat without cards a hand."""
+        rng.shuffle(self.deck)
+        for seat in self.seats(self.live):
+            if self.hole[seat] is None:
+                self.hole[seat] = (self.deck.pop(), self.deck.pop())
+
+    def candidates(self):
+        """Distinct legal actions for the actor: (action, raise-to or 0)."""
+        seat = self.actor
+        to_call = self.to_call()
+        stack_to = self.bets[seat] + self.chips[seat]
+        out = [("fold", 0)] if to_call > 0 else []
+        out.append(("call", to_call) if to_call > 0 else ("check", 0))
+        min_to = self.current_bet + self.min_raise
+        pot_to = self.current_bet + self.pot() + to_call
+        for raise_to in sorted({min_to, pot_to}):
+            if raise_to < stack_to and to_call < self.chips[seat]:
+                out.append(("raise", raise_to))
+        if self.chips[seat] > to_call:
+            out.append(("all-in", self.chips[seat]))
+        return out
+
+    def _pay(self, seat, amount):
+        amount = min(amount, self.chips[seat])
+        self.chips[seat] -= amount
+        self.bets[seat] += amount
+        self.contrib[seat] += amount
+
+    def apply(self, action, amount=0):
+        """Apply the actor's action (Dealer semantics: raise amount is raise-to)."""
+        seat = self.actor
+        if action == "fold":
+            self.live &= ~(1 << seat)
+        elif action == "call":
+            self._pay(seat, self.current_bet - self.bets[seat])
+        elif action in ("raise", "all-in"):
+            target = amount if action == "raise" else self.bets[seat] + self.chips[seat]
+            self._pay(seat, max(target, self.current_bet) - self.bets[seat])
+            if self.bets[seat] > self.current_bet:
+                self.min_raise = max(self.min_raise if action == "all-in" else 0,
+                                     self.bets[seat] - self.current_bet)
+                self.current_bet = self.bets[seat]
+                self.pending = self._can_act()
+        self.pending &= ~(1 << seat)
+        self._advance(seat)
+
+    def _can_act(self):
+        return self.live & ~sum(1 << s for s, c in enumerate(self.chips) if c == 0)
+
+    def _advance(self, seat):
+        if bin(self.live).count("1") == 1:
+            self.actor = -1
+            return
+        n = len(self.chips)
+        while not self.pending:
+            if len(self.board) == 5:
+                self.actor = -1
+                return
+            self.board.extend(self.deck.pop() for _ in range(3 if not self.board else 1))
+            self.bets = [0] * n
+            self.current_bet = 0
+            self.min_raise = self.big_blind
+            can_act = self._can_act()
+            self.pending = can_act if bin(can_act).count("1") > 1 else 0
+            seat = self.button
+        for step in range(1, n + 1):
+            nxt = (seat + step) % n
+            if self.pending >> nxt & 1:
+                self.actor = nxt
+                return
+
+    def settle(self):
+        """Award the pot (with side pots); return every seat's final chips."""
+        chips = self.chips[:]
+        live = self.seats(self.live)
+        if len(live) == 1:
+            chips[live[0]] += self.pot()
+            return chips
+        scores = {s: _evaluator.evaluate(self.board, list(self.hole[s])) for s in live}
+        levels = sorted({self.contrib[s] for s in live})
+        prev = 0
+        for level in levels:
+            layer = sum(min(c, level) - min(c, prev) for c in self.contrib)
+            eligible = [s for s in live if self.contrib[s] >= level]
+            best = min(scores[s] for s in eligible)
+            winners = [s for s in eligible if scores[s] == best]
+            for s in winners:
+                chips[s] += layer // len(winners)
+            chips[winners[0]] += layer % len(winners)
+            prev = level
+        return chips
+
+
+def strength(hole, board, opponents):
+    """Cheap equity proxy: preflop table, else made-hand percentile per opponent."""
+    if not board:
+        table = _PREFLOP_EQUITY.get(str(min(max(opponents, 1), 8))) or _PREFLOP_EQUITY
+        return table.get(_hand_key(hole), 1.0 / (opponents + 1))
+    pct = _evaluator.get_five_card_rank_percentage(_evaluator.evaluate(board, list(hole)))
+    return (1.0 - pct) ** max(opponents, 1)
+
+
+def policy(state, rng, cache):
+    """AI decision tree for the actor on its (noisy) strength; cache is per rollout."""
+    seat = state.actor
+    players = bin(state.live).count("1")
+    key = (seat, len(state.board), players)
+    eq = cache.get(key)
+    if eq is None:
+        eq = strength(state.hole[seat], state.board, players - 1)
+        eq = cache[key] = max(0.0, min(1.0, eq + rng.uniform(-STRENGTH_NOISE, STRENGTH_NOISE)))
+    to_call = state.to_call()
+    chips = state.chips[seat]
+    action, amount = _compute_action(eq, to_call, state.pot(), chips,
+                                     state.current_bet + state.min_raise,
+                                     state.bets[seat] + chips, len(state.board), players)
+    if action == "raise" and amount <= state.current_bet:
+        action = "call" if to_call else "check"
+    if action == "call" and to_call == 0:
+        action = "check"
+    return action, amount
+
+
+def play_out(state, rng):
+    """Finish the hand with every seat on policy(); return final chips per seat."""
+    cache = {}
+    while state.actor >= 0:
+        state.apply(*policy(state, rng, cache))
+    return state.settle()
+
+
+class RolloutAdvisor:
+    def __init__(self, budget=ROLLOUT_BUDGET, max_rollouts=MAX_ROLLOUTS, seed=None):
+        self.budget = budget
+        self.max_rollouts = max_rollouts
+        self.rng = random.Random(seed)
+
+    def evaluate(self, state, candidates=None):
+        """{(action, amount): (chip EV, rollouts)} for the actor, within the budget.
+
+        EV is the change in the actor's stack from the decision point, so
+        folding is always 0 and chips already in the pot are sunk.
+        """
+        hero = state.actor
+        start = state.chips[hero]
+        candidates = candidates or state.candidates()
+        totals = {c: 0.0 for c in candidates}
+        root = state.snapshot()
+        work = HandState(*root)
+        deadline = time.perf_counter() + self.budget
+        n = 0
+        while n < self.max_rollouts and (n == 0 or time.perf_counter() < deadline):
+            work.restore(root)
+            work.deal_unknown(self.rng)
+            dealt = work.snapshot()
+            seed = self.rng.getrandbits(32)
+            for c in candidates:
+                work.restore(dealt)
+                work.apply(*c)
+                totals[c] += play_out(work, random.Random(seed))[hero] - start
+            n += 1
+        return {c: (total / n, n) for c, total in totals.items()}
+
+    def best(self, state):
+        evs = self.evaluate(state)
+        return max(evs, key=lambda c: evs[c][0]), evs
+
+
+class RolloutAIPlayer(AIPlayer):
+    """AIPlayer that looks ahead: picks the best rollout EV when the Dealer
+    provides a hand_state, and falls back to the decision tree otherwise."""
+
+    uses_hand_state = True
+
+    def __init__(self, name, chips=1000, advisor=None):
+        super().__init__(name, chips)
+        self.advisor = advisor or RolloutAdvisor(budget=0.1, max_rollouts=100)
+        self.hand_state = None
+
+    def choose_action(self, to_call, min_raise, max_raise, pot, current_bet=0, equity=None, num_community=5, players_in_hand=2, big_blind=10, icm_equity=None, potential=None, opponent_stats=None):
+        state, self.hand_state = self.hand_state, None
+        if state is None:
+            return super().choose_action(to_call, min_raise, max_raise, pot, current_bet, equity,
+                                         num_community, players_in_hand, big_blind, icm_equity,
+                                         potential, opponent_stats)
+        (action, amount), _ = self.advisor.best(state)
+        if action == "call" and amount >= self.chips:
+            return ("all-in", self.chips)
+        return (action, amount)
@@ -0,0 +1,204 @@
+"""Cross-process shared-memory equity cache for simulation workers.
+
+A fixed-capacity hash table in multiprocessing.shared_memory, keyed by
+equity.spot_key() (suit-canonical hole, board and opponent count). The table
+is split into buckets of BUCKET_SLOTS slots; a key lives only in its own
+bucket, and a full bucket evicts one slot. Inserts take one of a set of
+striped locks (bucket number modulo stripes); lookups are lock-free and
+re-read the key after the value to detect a concurrent overwrite.
+
+Usage with a process pool:
+
+    cache = SharedEquityCache.create(capacity=1 << 20, snapshot="equity.cache")
+    with Pool(16, initializer=init_worker, initargs=(cache,)) as pool:
+        ...
+    print(cache.worker_stats())
+    cache.save("equity.cache")
+    cache.close(unlink=True)
+"""
+
+import os
+import struct
+from multiprocessing import Lock
+from multiprocessing.shared_memory import SharedMemory
+
+import equity
+
+BUCKET_SLOTS = 8
+STRIPES = 64
+MAX_WORKERS = 256
+
+_HEADER = struct.Struct("<QQQ")   # capacity, stripes, registered workers
+_SLOT = struct.Struct("<Qd")      # key (0 = empty), equity
+_STATS = struct.Struct("<QQQ")    # hits, misses, inserts per worker
+
+
+def _hash(key):
+    # splitmix64 finalizer, so nearby keys spread over buckets
+    key = (key ^ (key >> 30)) * 0xBF58476D1CE4E5B9 & 0xFFFFFFFFFFFFFFFF
+    key = (key ^ (key >> 27)) * 0x94D049BB133111EB & 0xFFFFFFFFFFFFFFFF
+    return key ^ (key >> 31)
+
+
+class SharedEquityCache:
+    def __init__(self, name, locks, register_lock):
+        self.name = name
+        self.locks = locks
+        self.register_lock = register_lock
+        self._shm = None
+        self.worker = None
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self._attach()
+
+    @classmethod
+    def create(cls, capacity=1 << 20, stripes=STRIPES, snapshot=None):
+        """Allocate a new table; capacity is rounded up to whole buckets."""
+        buckets = max(1, -(-capacity // BUCKET_SLOTS))
+        capacity = buckets * BUCKET_SLOTS
+        size = _HEADER.size + capacity * _SLOT.size + MAX_WORKERS * _STATS.size
+        shm = SharedMemory(create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        _HEADER.pack_into(shm.buf, 0, capacity, stripes, 0)
+        cache = cls(shm.name, [Lock() for _ in range(stripes)], Lock())
+        cache._owner = shm
+        if snapshot and os.path.exists(snapshot):
+            cache.load(snapshot)
+        return cache
+
+    def _attach(self):
+        self._shm = SharedMemory(name=self.name)
+        self.capacity, self.stripes, _ = _HEADER.unpack_from(self._shm.buf, 0)
+        self.buckets = self.capacity // BUCKET_SLOTS
+        self._slots_at = _HEADER.size
+        self._stats_at = self._slots_at + self.capacity * _SLOT.size
+
+    def __getstate__(self):
+        # Locks travel by inheritance (Pool initargs / Process args)
+        return {"name": self.name, "locks": self.locks, "register_lock": self.register_lock}
+
+    def __setstate__(self, state):
+        self.__init__(state["name"], state["locks"], state["register_lock"])
+
+    def register_worker(self):
+        """Claim a per-worker stats slot so hit rates are visible to the parent."""
+        with self.register_lock:
+            capacity, stripes, workers = _HEADER.unpack_from(self._shm.buf, 0)
+            if workers >= MAX_WORKERS:
+                return None
+            _HEADER.pack_into(self._shm.buf, 0, capacity, stripes, workers + 1)
+        self.worker = workers
+        return workers
+
+    def _bucket(self, key):
+        return _hash(key) % self.buckets
+
+    def _slot_offset(self, bucket, i):
+        return self._slots_at + (bucket * BUCKET_SLOTS + i) * _SLOT.size
+
+    def get(self, key):
+        buf = self._shm.buf
+        bucket = self._bucket(key)
+        for i in range(BUCKET_SLOTS):
+            off = self._slot_offset(bucket, i)
+            slot_key, value = _SLOT.unpack_from(buf, off)
+            if slot_key == 0:
+                break
+            if slot_key == key:
+                # An insert may have replaced the slot between the two reads
+                if struct.unpack_from("<Q", buf, off)[0] == key:
+                    self._count(hit=True)
+                    return value
+                break
+        self._count(hit=False)
+        return None
+
+    def put(self, key, value):
+        buf = self._shm.buf
+        bucket = self._bucket(key)
+        with self.locks[bucket % self.stripes]:
+            target = None
+            for i in range(BUCKET_SLOTS):
+                off = self._slot_offset(bucket, i)
+                slot_key = struct.unpack_from("<Q", buf, off)[0]
+                if slot_key == key or slot_key == 0:
+                    target = off
+                    break
+            if target is None:
+                # Bucket full: evict a slot chosen by the key's hash
+                target = self._slot_offset(bucket, (_hash(key) >> 32) % BUCKET_SLOTS)
+            # Clear the key first so lock-free readers never pair it with a new value
+            struct.pack_into("<Q", buf, target, 0)
+            struct.pack_into("<d", buf, target + 8, value)
+            struct.pack_into("<Q", buf, target, key)
+        self.inserts += 1
+        self._publish()
+
+    def _count(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._publish()
+
+    def _publish(self):
+        if self.worker is not None:
+            _STATS.pack_into(self._shm.buf, self._stats_at + self.worker * _STATS.size,
+                             self.hits, self.misses, self.inserts)
+
+    def stats(self):
+        """This process's counters."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "inserts": self.inserts,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def worker_stats(self):
+        """Counters for every registered worker, readable from any process."""
+        workers = _HEADER.unpack_from(self._shm.buf, 0)[2]
+        out = []
+        for w in range(workers):
+            hits, misses, inserts = _STATS.unpack_from(self._shm.buf, self._stats_at + w * _STATS.size)
+            lookups = hits + misses
+            out.append({"worker": w, "hits": hits, "misses": misses, "inserts": inserts,
+                        "hit_rate": hits / lookups if lookups else 0.0})
+        return out
+
+    def entries(self):
+        buf = self._shm.buf
+        return sum(1 for i in range(self.capacity)
+                   if struct.unpack_from("<Q", buf, self._slots_at + i * _SLOT.size)[0])
+
+    def save(self, path):
+        """Snapshot the slot table to disk for a warm start."""
+        slots = bytes(self._shm.buf[self._slots_at:self._stats_at])
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(struct.pack("<Q", self.capacity))
+            f.write(slots)
+        os.replace(tmp, path)
+
+    def load(self, path):
+        """Reinsert every entry from a snapshot (capacities may differ)."""
+        with open(path, "rb") as f:
+            capacity = struct.unpack("<Q", f.read(8))[0]
+            data = f.read(capacity * _SLOT.size)
+        for i in range(len(data) // _SLOT.size):
+            key, value = _SLOT.unpack_from(data, i * _SLOT.size)
+            if key:
+                self.put(key, value)
+        self.inserts = 0
+
+    def close(self, unlink=False):
+        self._shm.close()
+        owner = getattr(self, "_owner", None)
+        if owner is not None:
+            owner.close()
+            if unlink:
+                owner.unlink()
+
+
+def init_worker(cache):
+    """Pool initializer: register for stats and route calculate_equity through the cache."""
+    cache.register_worker()
+    equity.set_shared_cache(cache)
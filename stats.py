@@ -0,0 +1,156 @@
+"""Constant-memory streaming player statistics (VPIP, PFR, aggression, WTSD).
+
+Each player owns a fixed-size block of counters. Actions update per-hand
+flags in O(1); end_hand() folds the flags into three views:
+
+    totals    -- lifetime counters
+    decayed   -- exponentially decayed counters (recent hands weigh more)
+    window    -- exact counters over the last `window` hands (ring buffer)
+
+Memory per player is fixed regardless of how many hands are played. Totals
+and decayed views merge across worker processes with merge(); windows are
+per-process and are not merged.
+"""
+
+from array import array
+
+HANDS, VPIP, PFR, BETS, CALLS, SAW_FLOP, SHOWDOWN, WON_SHOWDOWN = range(8)
+FIELDS = 8
+
+_VPIP_BIT, _PFR_BIT, _FLOP_BIT, _SD_BIT, _WON_BIT = 1, 2, 4, 8, 16
+
+DEFAULT_WINDOW = 100
+DEFAULT_DECAY = 0.99  # weight kept per hand, ~100-hand memory
+
+
+class _Slot:
+    __slots__ = ("totals", "decayed", "window", "ring_flags", "ring_bets", "ring_calls",
+                 "ring_pos", "ring_len", "flags", "bets", "calls", "in_hand")
+
+    def __init__(self, window):
+        self.totals = array("d", bytes(8 * FIELDS))
+        self.decayed = array("d", bytes(8 * FIELDS))
+        self.window = array("d", bytes(8 * FIELDS))
+        self.ring_flags = array("B", bytes(window))
+        self.ring_bets = array("H", bytes(2 * window))
+        self.ring_calls = array("H", bytes(2 * window))
+        self.ring_pos = 0
+        self.ring_len = 0
+        self.flags = 0
+        self.bets = 0
+        self.calls = 0
+        self.in_hand = False
+
+
+def _hand_vector(flags, bets, calls):
+    return (1, flags & _VPIP_BIT and 1, flags & _PFR_BIT and 1, bets, calls,
+            flags & _FLOP_BIT and 1, flags & _SD_BIT and 1, flags & _WON_BIT and 1)
+
+
+class PlayerStats:
+    def __init__(self, window=DEFAULT_WINDOW, decay=DEFAULT_DECAY):
+        self.window_size = window
+        self.decay = decay
+        self._slots = {}
+
+    def _slot(self, name):
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = self._slots[name] = _Slot(self.window_size)
+        return slot
+
+    def start_hand(self, names):
+        for name in names:
+            slot = self._slot(name)
+            slot.flags = 0
+            slot.bets = 0
+            slot.calls = 0
+            slot.in_hand = True
+
+    def record_action(self, name, action, preflop, aggressive=None):
+        """Record one betting action. aggressive overrides the default (raise only)."""
+        slot = self._slot(name)
+        if aggressive is None:
+            aggressive = action == "raise"
+        if preflop:
+            if action in ("call", "raise", "all-in"):
+                slot.flags |= _VPIP_BIT
+            if aggressive:
+                slot.flags |= _PFR_BIT
+        elif aggressive:
+            slot.bets += 1
+        elif action in ("call", "all-in"):
+            slot.calls += 1
+
+    def saw_flop(self, names):
+        for name in names:
+            self._slot(name).flags |= _FLOP_BIT
+
+    def showdown(self, names, winners):
+        for name in names:
+            slot = self._slot(name)
+            slot.flags |= _SD_BIT
+            if name in winners:
+                slot.flags |= _WON_BIT
+
+    def end_hand(self):
+        decay = self.decay
+        for slot in self._slots.values():
+            if not slot.in_hand:
+                continue
+            slot.in_hand = False
+            vec = _hand_vector(slot.flags, slot.bets, slot.calls)
+            for i in range(FIELDS):
+                slot.totals[i] += vec[i]
+                slot.decayed[i] = slot.decayed[i] * decay + vec[i]
+
+            # Window: drop the hand falling out of the ring, add this one
+            pos = slot.ring_pos
+            if slot.ring_len == self.window_size:
+                old = _hand_vector(slot.ring_flags[pos], slot.ring_bets[pos], slot.ring_calls[pos])
+                for i in range(FIELDS):
+                    slot.window[i] -= old[i]
+            else:
+                slot.ring_len += 1
+            slot.ring_flags[pos] = slot.flags
+            slot.ring_bets[pos] = min(slot.bets, 0xFFFF)
+            slot.ring_calls[pos] = min(slot.calls, 0xFFFF)
+            for i in range(FIELDS):
+                slot.window[i] += vec[i]
+            slot.ring_pos = (pos + 1) % self.window_size
+
+    def view(self, name, kind="totals"):
+        """Summary rates for one player: kind is 'totals', 'decayed' or 'window'."""
+        slot = self._slots.get(name)
+        if slot is None:
+            return None
+        c = getattr(slot, kind)
+        hands = c[HANDS]
+        if hands <= 0:
+            return None
+        return {
+            "hands": hands,
+            "vpip": c[VPIP] / hands,
+            "pfr": c[PFR] / hands,
+            "af": c[BETS] / c[CALLS] if c[CALLS] else float(c[BETS]),
+            "wtsd": c[SHOWDOWN] / c[SAW_FLOP] if c[SAW_FLOP] else 0.0,
+            "wsd": c[WON_SHOWDOWN] / c[SHOWDOWN] if c[SHOWDOWN] else 0.0,
+        }
+
+    def forget(self, name):
+        """Drop everything tracked for one player."""
+        self._slots.pop(name, None)
+
+    def merge(self, other, names=None):
+        """Add another tracker's totals and decayed counters (e.g. from a worker).
+
+        names limits the merge to those players.
+        """
+        for name, theirs in other._slots.items():
+            if names is not None and name not in names:
+                continue
+            mine = self._slot(name)
+            for i in range(FIELDS):
+                mine.totals[i] += theirs.totals[i]
+                mine.decayed[i] += theirs.decayed[i]
+        return self
@@ -1,3 +1,6 @@
+from stats import PlayerStats
+
+
 class Table:
     def __init__(self, small_blind=5, big_blind=10, escalate_every=10):
         self.community_cards = []
@@ -5,11 +8,17 @@ class Table:
         self.contributions = {}
         self.small_blind = small_blind
         self.big_blind = big_blind
-        self.escalate_every = escalate_every
+        self.escalate_every = escalate_every  # None: the caller drives the blind schedule
         self.hand_count = 0
         self.dealer_pos = 0
         self.positions = {}  # player name → "D", "S", or "B"
         self.equities = {}  # player name → equity float
+        self.potentials = {}  # player name → equity.calculate_potential() dict
+        # Cheat mode, from everyone's known cards
+        self.known_equities = {}  # player name → share of the whole pot
+        self.pairwise = {}  # player name → {opponent name → heads-up equity}
+        self.pot_evs = {}  # player name → expected chips back from the side pots
+        self.stats = PlayerStats()  # streaming VPIP/PFR/aggression/WTSD per player
 
     def escalate_blinds(self):
         self.small_blind *= 2
@@ -21,7 +30,11 @@ class Table:
         self.contributions = {}
         self.positions = {}
         self.equities = {}
+        self.potentials = {}
+        self.known_equities = {}
+        self.pairwise = {}
+        self.pot_evs = {}
         self.hand_count += 1
-        if self.hand_count > 0 and self.hand_count % self.escalate_every == 0:
+        if self.escalate_every and self.hand_count % self.escalate_every == 0:
             self.escalate_blinds()
             print(f"\n  ** Blinds increasing to ${self.small_blind}/${self.big_blind} **\n")
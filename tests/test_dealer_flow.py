@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+from dealer import Dealer
+from frontend import BotFrontend, Frontend, ScriptedFrontend, run_sync
+from player import Player
+from table import Table
+
+START = 1000
+
+
+class Folder(Player):
+    """Checks when it can, folds otherwise (only scripted actions bet)."""
+
+    def choose_action(self, to_call, *args, **kwargs):
+        return ("check", 0) if to_call == 0 else ("fold", 0)
+
+
+def make_dealer(script, n=3, frontend=None):
+    players = [Folder(name, START) for name in "ABCDEFGHI"[:n]]
+    table = Table(10, 20, escalate_every=None)
+    table.dealer_pos = n - 1  # button moves to A for the first hand
+    frontend = frontend or ScriptedFrontend(script)
+    return Dealer(table, players, frontend), players, frontend
+
+
+def events(log, event):
+    return [data for name, data in log if name == event]
+
+
+def test_everyone_folds_to_the_big_blind():
+    # A is the button (first to act three-handed), B posts 10, C posts 20
+    dealer, players, frontend = make_dealer({"A": [("fold", 0)], "B": [("fold", 0)]})
+    assert dealer.play_hand(seed=1)
+
+    kinds = [name for name, _ in frontend.log]
+    assert kinds[:2] == ["state", "wait"]
+    actions = [(d["player"].name, d["action"]) for d in events(frontend.log, "action")]
+    assert actions == [("A", "fold"), ("B", "fold")]
+    (result,) = events(frontend.log, "no_showdown")
+    assert result["winner"].name == "C" and result["pot"] == 30
+    assert [p.chips for p in players] == [START, START - 10, START + 10]
+    assert "runout" not in kinds and "showdown" not in kinds
+
+
+def test_preflop_all_in_runs_out_the_board():
+    dealer, players, frontend = make_dealer({"A": [("all-in", 0)], "B": [("fold", 0)],
+                                            "C": [("call", 0)]})
+    assert dealer.play_hand(seed=7)
+
+    (runout,) = events(frontend.log, "runout")
+    assert [p.name for p in runout["players"]] == ["A", "C"]
+    assert runout["ladder"] is None  # headless front ends skip the equity ladder
+    assert len(runout["board"]) == 5
+    # No betting prompts after the all-in: runout goes straight to showdown
+    kinds = [name for name, _ in frontend.log]
+    assert kinds.index("runout") == kinds.index("showdown") - 1
+    assert "wait" not in kinds[kinds.index("runout"):]
+
+    (showdown,) = events(frontend.log, "showdown")
+    assert showdown["pot"] == 2 * START + 10
+    assert sum(p.chips for p in players) == 3 * START
+
+
+def test_seeded_hands_replay_identically():
+    logs = []
+    for _ in range(2):
+        dealer, players, frontend = make_dealer({"A": [("all-in", 0)], "B": [("call", 0)],
+                                                "C": [("call", 0)]})
+        dealer.play_hand(seed=42)
+        logs.append(([p.hole_cards for p in players], dealer.table.community_cards,
+                     [p.chips for p in players]))
+    assert logs[0] == logs[1]
+
+
+def test_elimination_event_after_bust():
+    for seed in range(50):
+        dealer, players, frontend = make_dealer({"A": [("all-in", 0)], "B": [("fold", 0)],
+                                                "C": [("call", 0)]})
+        dealer.play_hand(seed=seed)
+        dealer.eliminate_players()
+        busted = [p for p in players if p.chips == 0]
+        if busted:
+            break
+    else:
+        pytest.fail("no seed produced a bust")
+    eliminated = [d["player"] for d in events(frontend.log, "elimination")]
+    assert eliminated == busted and not busted[0].is_active
+
+
+def test_checked_down_hand_waits_on_every_street():
+    # Nobody bets after the blinds: B completes, C checks, then all check down
+    dealer, players, frontend = make_dealer({"A": [("fold", 0)], "B": [("call", 0)]}, n=3)
+    dealer.play_hand(seed=3)
+    waits = [d["message"] for d in events(frontend.log, "wait")]
+    assert waits == ["Press Enter for preflop betting...", "Press Enter for flop betting...",
+                     "Press Enter for turn betting...", "Press Enter for river betting..."]
+    assert len(dealer.table.community_cards) == 5
+    assert sum(p.chips for p in players) == 3 * START
+
+
+class SleepyFrontend(Frontend):
+    """Awaits a real timer before each decision, like the terminal's AI delay."""
+
+    needs_loop = True
+
+    async def decide(self, dealer, player, **spot):
+        await asyncio.sleep(0.001)
+        return player.choose_action(**spot)
+
+
+def test_run_sync_rejects_real_awaits():
+    dealer, _, _ = make_dealer({}, frontend=SleepyFrontend())
+    with pytest.raises(RuntimeError):
+        run_sync(dealer.play_hand_async(seed=1))
+
+
+def test_play_hand_runs_loop_frontends_under_asyncio():
+    dealer, players, _ = make_dealer({}, frontend=SleepyFrontend())
+    assert dealer.play_hand(seed=1)
+    assert sum(p.chips for p in players) == 3 * START
+
+
+def test_tables_play_concurrently_on_one_loop():
+    from frontend import play_concurrently
+
+    dealers = [make_dealer({}, frontend=BotFrontend())[0] for _ in range(3)]
+    results = asyncio.run(play_concurrently(dealers))
+    assert results == [True, True, True]
+
+
+def test_players_see_opponent_stats_once_tracked():
+    class Recorder(Folder):
+        seen = []
+
+        def choose_action(self, to_call, *args, opponent_stats=None, **kwargs):
+            Recorder.seen.append((self.name, opponent_stats))
+            return super().choose_action(to_call, *args, **kwargs)
+
+    players = [Recorder(name, START) for name in "ABC"]
+    table = Table(10, 20, escalate_every=None)
+    dealer = Dealer(table, players, ScriptedFrontend({}))
+    dealer.play_hand(seed=3)
+    dealer.play_hand(seed=4)
+    (actor, first), (_, last) = Recorder.seen[0], Recorder.seen[-1]
+    assert set(first) == set("ABC") - {actor}
+    assert all(view is None for view in first.values())  # nothing recorded yet
+    assert all(view["hands"] >= 1 for view in last.values())
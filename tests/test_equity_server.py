@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from equity_server import EquityServer, request_key
+
+
+@pytest.mark.parametrize("msg", [[1, 2], "x", 3, None])
+def test_non_object_messages_get_a_bad_request_reply(msg):
+    reply = asyncio.run(EquityServer()._handle_request(msg))
+    assert reply["error"].startswith("bad request")
+
+
+@pytest.mark.parametrize("hole, board, opponents", [
+    (["As", "As"], [], 1),                        # duplicate card
+    (["As", "Xx"], [], 1),                        # not a card
+    (["As", "Kd"], ["2c", "3c", "4c", "5c", "6c", "7c"], 1),  # six-card board
+    (["As", "Kd"], [], 0),                        # nobody to play against
+])
+def test_request_key_rejects_invalid_spots(hole, board, opponents):
+    with pytest.raises(ValueError):
+        request_key(hole, board, opponents)
+
+
+def test_request_key_ignores_card_order():
+    assert request_key(["Kd", "As"], ["8h", "7h", "2c"], 2) == request_key(["As", "Kd"], ["2c", "7h", "8h"], 2)
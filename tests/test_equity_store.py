@@ -0,0 +1,157 @@
+import sqlite3
+
+import pytest
+from treys import Card, Deck
+
+import equity
+import equity_store
+from dealer import Dealer
+from equity_store import EquityStore
+from frontend import Frontend
+from player import HumanPlayer, Player
+from table import Table
+
+HOLE = [Card.new("Ah"), Card.new("Kd")]
+TURN = [Card.new(c) for c in ("7h", "8h", "2c", "Js")]
+REMAINING = [c for c in Deck.GetFullDeck() if c not in HOLE + TURN]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EquityStore(str(tmp_path / "equity.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def routed(store):
+    equity.set_equity_store(store)
+    yield store
+    equity.set_equity_store(None)
+
+
+def test_merge_weights_equity_and_combines_variance(store):
+    store.merge(1, 0.5, 100, 0.01)
+    equity_, samples, se = store.merge(1, 0.8, 300, 0.0004)
+    assert equity_ == pytest.approx((0.5 * 100 + 0.8 * 300) / 400)
+    assert samples == 400
+    assert se == pytest.approx((0.01 * 100 ** 2 + 0.0004 * 300 ** 2) ** 0.5 / 400)
+    store.flush()  # committed rows merge the same way as pending ones
+    assert store.get(1) == pytest.approx((equity_, samples, se))
+
+
+def test_potential_is_merged_by_the_passes_that_measured_it(store):
+    fields = dict.fromkeys(equity_store.POTENTIAL_FIELDS, 0.2)
+    store.merge(1, 0.5, 100, 0.01)                      # equity-only pass
+    store.merge(1, 0.5, 100, 0.01, fields)
+    assert store.get(1, potential=True)[3] == pytest.approx(fields)
+    store.flush()
+    store.merge(1, 0.5, 300, 0.01, dict.fromkeys(equity_store.POTENTIAL_FIELDS, 0.6))
+    assert store.get(1, potential=True)[3]["ppot"] == pytest.approx(0.5)
+    store.flush()
+    assert store.get(1, potential=True)[3]["ppot"] == pytest.approx(0.5)
+    assert store.get(2, potential=True) is None
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "equity.sqlite3")
+    first = EquityStore(path)
+    first.merge(7, 0.25, 50, 0.001)
+    first.close()
+    second = EquityStore(path)
+    assert second.get(7) == pytest.approx((0.25, 50, 0.001 ** 0.5))
+    second.close()
+
+
+@pytest.mark.parametrize("columns, row", [
+    ("used INTEGER NOT NULL", (1, 0.5, 1000000, 1)),  # before variances
+    ("variance REAL NOT NULL, used INTEGER NOT NULL", (1, 0.5, 1000000, 0.0, 1)),  # before potential
+])
+def test_old_stores_are_rebuilt(tmp_path, columns, row):
+    path = str(tmp_path / "equity.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE equity (key INTEGER PRIMARY KEY, equity REAL NOT NULL, "
+               f"samples INTEGER NOT NULL, {columns})")
+    db.execute(f"INSERT INTO equity VALUES ({', '.join('?' * len(row))})", row)
+    db.commit()
+    db.close()
+    store = EquityStore(path)
+    assert store.get(1) is None
+    store.merge(1, 0.5, 10, 0.01)
+    store.close()
+
+
+def test_lookups_are_flushed_in_bounded_batches(store, monkeypatch):
+    monkeypatch.setattr(equity_store, "TOUCH_FLUSH", 8)
+    for key in range(1, 21):
+        store.merge(key, 0.5, 10, 0.01)
+    store.flush()
+    for key in range(1, 21):
+        store.get(key)
+        assert len(store._touched) < 8
+
+
+def test_turn_spot_is_refined_until_trusted(routed):
+    key = equity.spot_key(HOLE, TURN, 1)
+    passes = 0
+    while True:
+        equity.calculate_equity(HOLE, TURN, 1, REMAINING)
+        passes += 1
+        stored = routed.get(key)
+        if stored[2] <= equity.STORE_TRUSTED_SE:
+            break
+        assert passes < 20
+    # Once trusted, the stored value is served without another pass
+    samples = stored[1]
+    assert equity.calculate_equity(HOLE, TURN, 1, REMAINING) == pytest.approx(stored[0])
+    assert routed.get(key)[1] == samples
+
+
+def test_potential_pass_refines_the_stored_spot(routed):
+    key = equity.spot_key(HOLE, TURN, 2)
+    result = equity.calculate_potential(HOLE, TURN, 2, REMAINING)
+    stored = routed.get(key)
+    assert stored is not None and stored[0] == pytest.approx(result["equity"])
+
+
+def human_dealer(frontend=None):
+    """Dealer on the TURN spot with the human holding HOLE against one opponent."""
+    human, opponent = HumanPlayer("You"), Player("Bot")
+    dealer = Dealer(Table(10, 20, escalate_every=None), [human, opponent], frontend or Frontend())
+    for p in (human, opponent):
+        p.is_in_hand = True
+    human.hole_cards = list(HOLE)
+    dealer.table.community_cards = list(TURN)
+    dealer.deck._cards = list(REMAINING)
+    return dealer
+
+
+def test_refined_human_equity_is_the_stored_value(routed):
+    dealer = human_dealer()
+    dealer.refine_human_equity = True
+    key = equity.spot_key(HOLE, TURN, 1)
+    for _ in range(3):
+        shown = dealer._compute_human_equity()
+        # The store already merged this pass; averaging again would overweight early passes
+        assert shown == pytest.approx(routed.get(key)[0])
+
+
+def test_trusted_spot_with_potential_skips_the_terminal_pass(routed, monkeypatch):
+    class PotentialFrontend(Frontend):
+        wants_potential = True  # as the terminal front end
+
+    dealer = human_dealer(PotentialFrontend())
+    first = dealer._compute_human_equity()
+    key = equity.spot_key(HOLE, TURN, 1)
+    # Make the entry trusted: a large, precise merge on top of the pass
+    routed.merge(key, first, 10 ** 7, 1e-12, dict.fromkeys(equity_store.POTENTIAL_FIELDS, 0.3))
+    trusted = routed.get(key, potential=True)
+
+    def no_pass(*args, **kwargs):
+        raise AssertionError("trusted spot was recomputed")
+
+    monkeypatch.setattr(equity, "_equity_counted", no_pass)
+    dealer._human_equity_key = None  # new decision point, same spot
+    assert dealer._compute_human_equity() == pytest.approx(trusted[0])
+    for name, value in trusted[3].items():
+        assert dealer._human_potential[name] == pytest.approx(value)
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from treys import Card, Deck
+
+import equity
+import precompute_flop_atlas as atlas
+from precompute_equity import hand_categories, representative_cards
+
+SEED = 7
+SIMS = 3
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def tiny_atlas(tmp_path_factory):
+    path = tmp_path_factory.mktemp("atlas") / "flop_atlas.bin"
+    subprocess.run([sys.executable, str(ROOT / "precompute_flop_atlas.py"), "--categories", "1",
+                    "--sims", str(SIMS), "--seed", str(SEED), "--workers", "1",
+                    "--output", str(path)], check=True, capture_output=True, cwd=ROOT)
+    return equity._load_flop_atlas(str(path))
+
+
+def relabel(cards, suits):
+    """Same cards with suits renamed (spades -> suits[0], hearts -> suits[1], ...)."""
+    mapping = dict(zip("shdc", suits))
+    return [Card.new(s[0] + mapping[s[1]]) for s in map(Card.int_to_str, cards)]
+
+
+def test_lookup_matches_simulate_spot_under_suit_relabeling(tiny_atlas, monkeypatch):
+    monkeypatch.setattr(equity, "_FLOP_ATLAS", tiny_atlas)
+    hand_key = next(hand_categories())
+    hole = representative_cards(hand_key)
+    flops = sorted(atlas.canonical_flops(hole).items())
+    for key, flop in flops[::max(1, len(flops) // 5)]:
+        expected = [round(v * 65535) / 65535
+                    for v in atlas.simulate_spot(hole, flop, SIMS, atlas.spot_rng(SEED, key))]
+        # Ask with the suits renamed: the canonical key must find the same row
+        q_hole, q_flop = relabel(hole, "dcsh"), relabel(flop, "dcsh")
+        remaining = [c for c in Deck.GetFullDeck() if c not in q_hole + q_flop]
+        for n in (1, 3, 8):
+            got = equity.calculate_equity(q_hole, q_flop, n, remaining)
+            assert got == pytest.approx(expected[n - 1], abs=1e-9)
+        potential = equity.calculate_potential(q_hole, q_flop, 1, remaining)
+        assert potential["ppot"] == pytest.approx(expected[8], abs=1e-9)
+        assert potential["npot"] == pytest.approx(expected[9], abs=1e-9)
+
+
+def test_hands_outside_the_atlas_fall_back_to_live_equity(tiny_atlas, monkeypatch):
+    monkeypatch.setattr(equity, "_FLOP_ATLAS", tiny_atlas)
+    hole = [Card.new("7c"), Card.new("2d")]  # not in the first category
+    flop = [Card.new(c) for c in ("Ks", "Qs", "2h")]
+    assert equity._flop_atlas_row(hole, flop) is None
@@ -0,0 +1,31 @@
+import icm
+
+
+def test_exact_matches_two_player_closed_form():
+    eq = icm.icm_equities([3000, 1000], (0.7, 0.3))
+    assert abs(eq[0] - (0.75 * 0.7 + 0.25 * 0.3)) < 1e-12
+
+
+def test_monte_carlo_fallback_is_seeded_and_close_to_exact(monkeypatch):
+    stacks = [4000, 2500, 1500, 1000, 600, 400]
+    exact = icm.icm_equities(stacks)
+    monkeypatch.setattr(icm, "EXACT_STATE_LIMIT", 0)
+    monkeypatch.setattr(icm, "_MC_MODELS", {})
+    first = icm.icm_equities(stacks, trials=20000)
+    assert max(abs(a - b) for a, b in zip(first, exact)) < 0.01
+
+    # The cached model is updated in place, and the same stacks give the same answer
+    moved = list(stacks)
+    moved[0], moved[5] = 3600, 800
+    icm.icm_equities(moved, trials=20000)
+    again = icm.icm_equities(stacks, trials=20000)
+    assert max(abs(a - b) for a, b in zip(first, again)) < 1e-9
+    assert len(icm._MC_MODELS) == 1
+
+
+def test_incremental_update_matches_fresh_model():
+    stacks = [5000, 3000, 2000, 1000, 500]
+    model = icm.ICM(stacks, trials=500, seed=3)
+    model.update(2, 4500)
+    fresh = icm.ICM([5000, 3000, 4500, 1000, 500], trials=500, seed=3)
+    assert max(abs(a - b) for a, b in zip(model.equities(), fresh.equities())) < 1e-9
@@ -0,0 +1,31 @@
+from multiprocessing import Pool
+
+from treys import Card, Deck
+
+import equity
+from shared_cache import SharedEquityCache, init_worker
+
+HOLE = [Card.new("Ah"), Card.new("Kd")]
+BOARD = [Card.new(c) for c in ("7h", "8h", "2c", "Js")]  # a turn: no atlas, computed live
+
+
+def _equity_and_stats(_):
+    remaining = [c for c in Deck.GetFullDeck() if c not in HOLE + BOARD]
+    value = equity.calculate_equity(HOLE, BOARD, 1, remaining)
+    return value, equity._SHARED_CACHE.stats()
+
+
+def test_second_process_hits_what_the_first_computed():
+    cache = SharedEquityCache.create(capacity=1024)
+    try:
+        results = []
+        for _ in range(2):  # a fresh pool is a fresh process, with cold module caches
+            with Pool(1, initializer=init_worker, initargs=(cache,)) as pool:
+                results.append(pool.map(_equity_and_stats, [None])[0])
+        (first, first_stats), (second, second_stats) = results
+        assert first_stats["hits"] == 0 and first_stats["inserts"] == 1
+        assert second_stats["hits"] == 1 and second_stats["inserts"] == 0
+        assert second == first
+        assert [w["hits"] for w in cache.worker_stats()] == [0, 1]
+    finally:
+        cache.close(unlink=True)
@@ -0,0 +1,29 @@
+from stats import PlayerStats
+
+
+def play(stats, name, hands, action):
+    for _ in range(hands):
+        stats.start_hand([name])
+        stats.record_action(name, action, preflop=True)
+        stats.end_hand()
+
+
+def test_merge_limited_to_names():
+    mine, theirs = PlayerStats(), PlayerStats()
+    play(theirs, "A", 3, "raise")
+    play(theirs, "B", 5, "call")
+    mine.merge(theirs, names=("A",))
+    assert mine.view("A")["hands"] == 3 and mine.view("A")["pfr"] == 1.0
+    assert mine.view("B") is None
+
+
+def test_moved_player_history_replaces_the_stale_view():
+    old_table, new_table = PlayerStats(), PlayerStats()
+    play(new_table, "A", 2, "call")     # seen here long ago
+    play(old_table, "A", 2, "call")     # ...carried to the old table when A moved there
+    play(old_table, "A", 4, "raise")
+    new_table.forget("A")
+    new_table.merge(old_table, names=("A",))
+    view = new_table.view("A")
+    assert view["hands"] == 6 and view["pfr"] == 4 / 6
+    assert new_table.view("A", "window") is None  # windows are not carried
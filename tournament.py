@@ -0,0 +1,237 @@
+"""Multi-table tournament (MTT) engine.
+
+Runs many Table/Dealer pairs with a synchronized blind schedule, breaks and
+balances tables as players bust, and plays AI-only tables in parallel on a
+process pool while the human's table runs at interactive pace.
+
+ICM only applies at the final table. Before that a table's stacks are a
+fraction of the field and its payouts are not this table's to win, so AI
+decisions use plain chip equity.
+
+Tables advance in rounds: every table plays one hand per round, then busts
+are recorded and seats rebalanced before the next round starts. An AI
+table's Dealer is shipped to a worker for its hand and the played copy
+replaces it, so workers share no Python state (equity.py's module caches
+are per process) and the tournament only ever reads the returned copies.
+"""
+
+import math
+import random
+from multiprocessing import Pool
+
+import equity
+from dealer import Dealer
+from shared_cache import SharedEquityCache, init_worker
+from frontend import TerminalFrontend, BotFrontend
+from display import render_chip_counts, wait_for_enter
+from icm import default_payouts
+from player import HumanPlayer, AIPlayer
+from table import Table
+
+SEATS_PER_TABLE = 9
+CACHE_CAPACITY = 1 << 20  # shared equity cache slots across table workers
+
+
+def _init_worker(cache):
+    # A forked worker must not share the parent's SQLite connection
+    equity.set_equity_store(None)
+    init_worker(cache)
+
+
+def _play_table_hand(args):
+    dealer, seed = args
+    random.seed(seed)  # decisions follow the parent's random state, so --seed still replays
+    dealer.play_hand()
+    return dealer
+
+
+class Tournament:
+    def __init__(self, entrants, start_stack=1000, small_blind=10, big_blind=20,
+                 escalate_every=10, seats=SEATS_PER_TABLE, human=True, workers=None):
+        self.entrants = entrants
+        self.seats = seats
+        self.escalate_every = escalate_every
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.round = 0
+        self.finish_order = []  # busted players, first out first
+        self.cache = None
+        self.pool = None
+        if workers != 1:
+            # Tables move between workers, so their equity spots do too
+            self.cache = SharedEquityCache.create(CACHE_CAPACITY)
+            self.pool = Pool(workers, initializer=_init_worker, initargs=(self.cache,))
+
+        self.human = HumanPlayer("You", start_stack) if human else None
+        players = [AIPlayer(f"Player {i}", start_stack)
+                   for i in range(1, entrants + (0 if human else 1))]
+        if self.human:
+            players.append(self.human)
+        random.shuffle(players)
+
+        num_tables = math.ceil(entrants / seats)
+        seatings = [players[i::num_tables] for i in range(num_tables)]
+        self.dealers = []
+        for seated in seatings:
+            table = Table(small_blind, big_blind, escalate_every=None)
+            table.dealer_pos = random.randrange(len(seated))
+            self.dealers.append(Dealer(table, seated, self._frontend_for(seated)))
+        self._set_payouts()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.cache is not None:
+            self.cache.close(unlink=True)
+            self.cache = None
+
+    def remaining_players(self):
+        return [p for d in self.dealers for p in d.players if p.is_active]
+
+    def _human_dealer(self):
+        for d in self.dealers:
+            if self.human in d.players:
+                return d
+        return None
+
+    def _escalate_blinds(self):
+        self.small_blind *= 2
+        self.big_blind *= 2
+        for d in self.dealers:
+            d.table.small_blind = self.small_blind
+            d.table.big_blind = self.big_blind
+
+    def play_round(self):
+        """Play one hand at every table; AI-only tables run on the process pool."""
+        self.round += 1
+        if self.escalate_every and self.round % self.escalate_every == 0:
+            self._escalate_blinds()
+            if self.human and self.human.is_active:
+                print(f"\n  ** Blinds increasing to ${self.small_blind}/${self.big_blind} **\n")
+
+        human_dealer = self._human_dealer()
+        others = [i for i, d in enumerate(self.dealers) if d is not human_dealer]
+        jobs = [(self.dealers[i], random.getrandbits(32)) for i in others]
+        if self.pool is not None:
+            pending = self.pool.map_async(_play_table_hand, jobs)
+        if human_dealer is not None:
+            human_dealer.play_hand()
+        played = pending.get() if self.pool is not None else map(_play_table_hand, jobs)
+        for i, dealer in zip(others, played):
+            self.dealers[i] = dealer
+
+        self._remove_busted()
+        self._balance_tables()
+
+    def _remove_busted(self):
+        for d in self.dealers:
+            busted = [p for p in d.players if p.is_active and p.chips <= 0]
+            for p in busted:
+                p.is_active = False
+                self.finish_order.append(p)
+                self._unseat(d, p)
+
+    def _unseat(self, dealer, player):
+        idx = dealer.players.index(player)
+        del dealer.players[idx]
+        n = len(dealer.players)
+        if n == 0:
+            dealer.table.dealer_pos = 0
+        elif idx <= dealer.table.dealer_pos:
+            dealer.table.dealer_pos = (dealer.table.dealer_pos - 1) % n
+
+    def _next_big_blind(self, dealer):
+        """The player who posts the big blind next hand moves first (standard MTT rule)."""
+        n = len(dealer.players)
+        return dealer.players[(dealer.table.dealer_pos + 3) % n] if n > 2 else dealer.players[-1]
+
+    def _seat(self, dealer, player):
+        # Join just before the button so the mover does not post blinds immediately
+        pos = dealer.table.dealer_pos
+        dealer.players.insert(pos, player)
+        dealer.table.dealer_pos = (pos + 1) % len(dealer.players)
+
+    def _move(self, source, target, player):
+        """Seat player at target, bringing what source's table has seen of them.
+
+        Stats are per table, so without this a moved player starts over as
+        an unknown. Source's view of the player already includes anything
+        carried from earlier tables, so it replaces target's older one.
+        Windows are not merged; the new table's window starts empty.
+        """
+        target.table.stats.forget(player.name)
+        target.table.stats.merge(source.table.stats, names=(player.name,))
+        self._seat(target, player)
+
+    def _balance_tables(self):
+        remaining = len(self.remaining_players())
+        needed = max(1, math.ceil(remaining / self.seats))
+
+        # Break the smallest tables until the field fits in the fewest tables
+        while len(self.dealers) > needed:
+            broken = min(self.dealers, key=lambda d: len(d.players))
+            self.dealers.remove(broken)
+            for p in list(broken.players):
+                target = min(self.dealers, key=lambda d: len(d.players))
+                self._move(broken, target, p)
+
+        # Even out table sizes to within one seat
+        while True:
+            largest = max(self.dealers, key=lambda d: len(d.players))
+            smallest = min(self.dealers, key=lambda d: len(d.players))
+            if len(largest.players) - len(smallest.players) <= 1:
+                break
+            mover = self._next_big_blind(largest)
+            self._unseat(largest, mover)
+            self._move(largest, smallest, mover)
+
+        for d in self.dealers:
+            d.frontend = self._frontend_for(d.players)
+        self._set_payouts()
+
+    def _set_payouts(self):
+        payouts = default_payouts(self.entrants) if len(self.dealers) == 1 else None
+        for d in self.dealers:
+            d.payouts = payouts
+
+    def _frontend_for(self, seated):
+        return TerminalFrontend() if self.human in seated else BotFrontend()
+
+    def _render_status(self):
+        dealer = self._human_dealer()
+        if dealer is not None:
+            render_chip_counts(dealer.players, dealer.payouts)
+        field = self.remaining_players()
+        avg = sum(p.chips for p in field) // max(len(field), 1)
+        print(f"  Field: {len(field)}/{self.entrants} left  |  "
+              f"{len(self.dealers)} table(s)  |  Avg stack ${avg}  |  "
+              f"Blinds ${self.small_blind}/${self.big_blind}\n")
+
+    def run(self, progress_every=50):
+        """Play until one player remains or the human busts. Returns the finish order."""
+        try:
+            while len(self.remaining_players()) > 1:
+                self.play_round()
+                if self.human is not None:
+                    if not self.human.is_active:
+                        place = len(self.remaining_players()) + 1
+                        print(f"\n  You have been eliminated in place {place} "
+                              f"of {self.entrants}. Game over!\n")
+                        return self.finish_order
+                    self._render_status()
+                    wait_for_enter()
+                elif progress_every and self.round % progress_every == 0:
+                    print(f"  Round {self.round}: {len(self.remaining_players())} left, "
+                          f"{len(self.dealers)} table(s)")
+        finally:
+            self.close()
+
+        winner = self.remaining_players()[0]
+        self.finish_order.append(winner)
+        if winner is self.human:
+            print(f"\n  You win the tournament!\n")
+        else:
+            print(f"\n  {winner.name} wins the tournament!\n")
+        return self.finish_order